@@ -0,0 +1,162 @@
+"""Admission control: per-endpoint-class concurrency caps with bounded wait queues.
+
+Handlers share the event loop, the threadpool and the analytics workers, so a burst of
+expensive requests (exports, analyses, batch queries, snapshot builds) can crowd out health
+checks and cheap lookups. Gating requests at the edge keeps each endpoint class within its
+own budget of in-flight work and turns overload into a fast rejection with ``Retry-After``
+instead of unbounded queueing.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Sequence, Tuple
+
+from prometheus_client import Counter, Gauge
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+LOGGER = logging.getLogger(__name__)
+
+IN_FLIGHT_GAUGE = Gauge(
+    "astro_admission_in_flight",
+    "Requests currently admitted, by endpoint class.",
+    ["endpoint_class"],
+)
+QUEUE_DEPTH_GAUGE = Gauge(
+    "astro_admission_queue_depth",
+    "Requests waiting for a slot, by endpoint class.",
+    ["endpoint_class"],
+)
+REJECTIONS_COUNTER = Counter(
+    "astro_admission_rejections",
+    "Requests rejected by admission control, by endpoint class and reason.",
+    ["endpoint_class", "reason"],
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; ``reason`` is ``queue_full`` or ``timeout``."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionGate:  # pylint: disable=too-many-instance-attributes
+    """Concurrency cap for one endpoint class with a bounded FIFO wait queue.
+
+    Slots are handed directly to the oldest waiter on release, so queued requests are
+    admitted in arrival order. All state is touched only from the event loop thread.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        concurrency: int,
+        queue_size: int,
+        *,
+        timeout: float,
+        retry_after: int,
+        reject_status: int = 503,
+    ) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.reject_status = reject_status
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        REJECTIONS_COUNTER.labels(self.name, reason).inc()
+        LOGGER.warning("Rejected %s request: %s", self.name, reason)
+        return AdmissionRejected(reason)
+
+    def _publish(self) -> None:
+        IN_FLIGHT_GAUGE.labels(self.name).set(self.in_flight)
+        QUEUE_DEPTH_GAUGE.labels(self.name).set(len(self._waiters))
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting up to ``timeout`` seconds in the queue for one."""
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("timeout") from None
+        except BaseException:
+            # Cancelled after a slot was already handed over: pass it on.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._publish()
+
+    def release(self) -> None:
+        """Return a slot, handing it to the oldest live waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self.in_flight -= 1
+        self._publish()
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware admitting HTTP requests through the gate of their path prefix.
+
+    ``routes`` is checked in order and the first matching prefix wins; unmatched paths
+    (health probes, metrics, static assets) are never gated. The slot is held until the
+    response body has been sent, so streaming exports count for their full duration.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[Tuple[str, AdmissionGate]]) -> None:
+        self.app = app
+        self.routes = tuple(routes)
+
+    def gate_for(self, path: str) -> AdmissionGate | None:
+        """Return the gate responsible for ``path``, if any."""
+        for prefix, gate in self.routes:
+            if path.startswith(prefix):
+                return gate
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gate = self.gate_for(scope["path"]) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await gate.acquire()
+        except AdmissionRejected as exc:
+            response = JSONResponse(
+                {"detail": f"Too many concurrent {gate.name} requests ({exc.reason})"},
+                status_code=gate.reject_status,
+                headers={"Retry-After": str(gate.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
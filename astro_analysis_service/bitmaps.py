@@ -0,0 +1,44 @@
+"""Packed bit-array helpers backed by Python integers.
+
+Bit ``i`` of a bitmap is set when row position ``i`` belongs to the set, so intersections
+are a single ``&`` and cardinalities a single ``int.bit_count()``.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterable, Iterator
+
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def from_positions(positions: Iterable[int], size: int) -> int:
+    """Return a bitmap with the bits for ``positions`` set."""
+    buffer = bytearray((size + 7) // 8)
+    for pos in positions:
+        buffer[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def full(size: int) -> int:
+    """Return a bitmap with the first ``size`` bits set."""
+    return (1 << size) - 1
+
+
+def count(bitmap: int) -> int:
+    """Return the number of set bits (population count)."""
+    return bitmap.bit_count()
+
+
+def iter_positions(bitmap: int) -> Iterator[int]:
+    """Yield set bit positions in ascending order."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index << 3
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def membership(bitmap: int, size: int) -> Callable[[int], bool]:
+    """Return an O(1) membership test for ``bitmap`` (plain ``int`` bit tests are O(size))."""
+    data = bitmap.to_bytes((size + 7) // 8, "little")
+    return lambda pos: bool(data[pos >> 3] >> (pos & 7) & 1)
@@ -0,0 +1,297 @@
+"""Response compression middleware and precompressed response/asset helpers."""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import mimetypes
+import os
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # pragma: no cover - exercised only when the optional extra is installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+LOGGER = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+PRECOMPRESS_SUFFIXES = frozenset(
+    {".html", ".js", ".mjs", ".css", ".json", ".svg", ".map", ".txt", ".xml", ".wasm"}
+)
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "font/woff")
+# Sidecar suffix for each content-coding, in server preference order.
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Return the content-codings this process can produce, best first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str, supported: Tuple[str, ...] | None = None) -> str | None:
+    """Pick the best supported content-coding allowed by an ``Accept-Encoding`` header.
+
+    Client q-values take priority; ties fall back to server preference (brotli first).
+    """
+    supported = supported if supported is not None else available_encodings()
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in supported:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, *, precompress: bool = False) -> bytes:
+    """Compress ``body`` with the given content-coding in one shot."""
+    if encoding == "br":
+        quality = PRECOMPRESS_BROTLI_QUALITY if precompress else BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    level = PRECOMPRESS_GZIP_LEVEL if precompress else GZIP_LEVEL
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk for streamed bodies."""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Compress ``chunk`` and flush so the client can decode it immediately."""
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """Return the trailing bytes that terminate the compressed stream."""
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses above a size threshold with brotli or gzip.
+
+    Responses that already carry a ``Content-Encoding`` (e.g. precompressed payloads) and
+    excluded media types such as event streams are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        passthrough = False
+        compressor: _StreamCompressor | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").lower()
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = encoding
+                if not more_body:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding)
+                await send(start_message)
+
+            chunk = compressor.feed(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class PrecompressedJSONCache:
+    """Bounded LRU of JSON payloads stored with every supported encoding ready to serve.
+
+    Each entry is encoded and compressed once, so repeated hits only pick a variant.
+    Keys should include the dataset generation so refreshed data never serves stale bytes.
+    """
+
+    def __init__(self, maxsize: int = 128, minimum_size: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.minimum_size = minimum_size
+        self._entries: OrderedDict[Any, Dict[str, bytes]] = OrderedDict()
+        self._lock = Lock()
+
+    async def respond(
+        self, key: Any, accept_encoding: str, producer: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """Return a response for ``key``, building and compressing it on first use.
+
+        ``producer`` is awaited only on a miss; encoding and compression run off the loop.
+        """
+        variants = self._lookup(key)
+        if variants is None:
+            variants = await run_in_threadpool(self._store, key, await producer())
+        return self._render(variants, accept_encoding)
+
+    def _lookup(self, key: Any) -> Dict[str, bytes] | None:
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+            return variants
+
+    def _store(self, key: Any, payload: Any) -> Dict[str, bytes]:
+        identity = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        variants = {"identity": identity}
+        for encoding in available_encodings():
+            variants[encoding] = compress(identity, encoding, precompress=True)
+        with self._lock:
+            self._entries[key] = variants
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return variants
+
+    def _render(self, variants: Dict[str, bytes], accept_encoding: str) -> Response:
+        encoding = choose_encoding(accept_encoding, tuple(variants.keys() - {"identity"}))
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding is None or len(variants["identity"]) < self.minimum_size:
+            return Response(variants["identity"], media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(variants[encoding], media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        """Drop every cached payload."""
+        with self._lock:
+            self._entries.clear()
+
+
+def precompress_directory(directory: Path, minimum_size: int = 1024) -> int:
+    """Write ``.gz``/``.br`` sidecars next to compressible static assets.
+
+    Sidecars that are newer than their source are kept, so this is cheap to call on every
+    startup after a build. Returns the number of sidecar files written.
+    """
+    written = 0
+    for path in directory.rglob("*"):
+        if not path.is_file() or path.suffix not in PRECOMPRESS_SUFFIXES:
+            continue
+        stat = path.stat()
+        if stat.st_size < minimum_size:
+            continue
+        for encoding in available_encodings():
+            sidecar = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+            if sidecar.exists() and sidecar.stat().st_mtime >= stat.st_mtime:
+                continue
+            try:
+                sidecar.write_bytes(compress(path.read_bytes(), encoding, precompress=True))
+            except OSError:
+                LOGGER.warning("Could not write precompressed asset %s", sidecar, exc_info=True)
+                return written
+            written += 1
+    LOGGER.info("Precompressed %s static assets under %s", written, directory)
+    return written
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """``StaticFiles`` that serves ``.br``/``.gz`` sidecars when the client accepts them."""
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        supported = tuple(
+            encoding for encoding, suffix in ENCODING_SUFFIXES.items()
+            if os.path.isfile(f"{full_path}{suffix}")
+        )
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), supported)
+        if encoding is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            if supported:
+                response.headers.setdefault("vary", "Accept-Encoding")
+            return response
+
+        sidecar = f"{full_path}{ENCODING_SUFFIXES[encoding]}"
+        response = FileResponse(
+            sidecar,
+            status_code=status_code,
+            stat_result=os.stat(sidecar),
+            media_type=mimetypes.guess_type(str(full_path))[0] or "text/plain",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -10,12 +10,27 @@ DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "data" / "cache" / "nasa_
 
 
 @dataclass(slots=True)
-class Settings:
+class Settings:  # pylint: disable=too-many-instance-attributes
     """Simple settings container sourced from environment variables."""
 
     nasa_cache_ttl_seconds: int = int(os.getenv("NASA_CACHE_TTL_SECONDS", "86400"))
     nasa_max_records: int = int(os.getenv("NASA_MAX_RECORDS", "150"))
     nasa_cache_path: Path = Path(os.getenv("NASA_CACHE_PATH", str(DEFAULT_CACHE_PATH)))
+    snapshot_max_rows: int = int(os.getenv("SNAPSHOT_MAX_ROWS", "5000"))
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    precompress_static: bool = os.getenv("PRECOMPRESS_STATIC", "1") not in ("0", "false", "False")
+    profiling_enabled: bool = os.getenv("ENABLE_PROFILING", "0") in ("1", "true", "True")
+    analytics_workers: int = int(os.getenv("ANALYTICS_WORKERS", "0"))
+    admission_standard_concurrency: int = int(os.getenv("ADMISSION_STANDARD_CONCURRENCY", "24"))
+    admission_standard_queue: int = int(os.getenv("ADMISSION_STANDARD_QUEUE", "64"))
+    admission_heavy_concurrency: int = int(os.getenv("ADMISSION_HEAVY_CONCURRENCY", "4"))
+    admission_heavy_queue: int = int(os.getenv("ADMISSION_HEAVY_QUEUE", "8"))
+    admission_admin_concurrency: int = int(os.getenv("ADMISSION_ADMIN_CONCURRENCY", "1"))
+    admission_admin_queue: int = int(os.getenv("ADMISSION_ADMIN_QUEUE", "1"))
+    admission_profile_concurrency: int = int(os.getenv("ADMISSION_PROFILE_CONCURRENCY", "2"))
+    admission_profile_queue: int = int(os.getenv("ADMISSION_PROFILE_QUEUE", "2"))
+    admission_queue_timeout: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+    admission_retry_after: int = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
 
 
 settings = Settings()
@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 import logging
-from functools import lru_cache
-from typing import List
-
-from .models import AstronomicalObject
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .config import settings
+from .dataset import Dataset
+from .models import AstronomicalObject, PlanetRow
 from .nasa_client import NASA_CLIENT, DISTANCE_PC_TO_LY
 
 LOGGER = logging.getLogger(__name__)
@@ -39,25 +43,202 @@ def _parse_float(value: str | float | None) -> float | None:
         return None
 
 
-def _load_from_nasa(force_refresh: bool = False) -> List[AstronomicalObject]:
-    records = NASA_CLIENT.get_objects(force_refresh=force_refresh)
-    objects: List[AstronomicalObject] = []
+def _fold_rows(host: AstronomicalObject, rows: List[PlanetRow]) -> AstronomicalObject:
+    """Return ``host`` carrying ``rows`` with the planet count and spectral type they imply."""
+    spectral = next((row.spectral_type for row in rows if row.spectral_type), "Unknown")
+    return host.model_copy(update={
+        "rows": rows,
+        "planet_count": len({row.name for row in rows}),
+        "spectral_type": spectral,
+    })
+
+
+def _group_by_host(records: Iterable[dict[str, str]]) -> List[AstronomicalObject]:
+    """Collapse ``ps`` rows (one per planet and parameter set) into one record per host.
+
+    A host takes its id and photometry from its first row, so ids stay TAP record positions
+    and hosts keep the query's magnitude order; its remaining rows become the child index.
+    """
+    hosts: Dict[str, AstronomicalObject] = {}
+    rows: Dict[str, List[PlanetRow]] = {}
     for idx, record in enumerate(records, start=1):
         obj = _api_record_to_object(record, idx)
-        if obj is not None:
-            objects.append(obj)
-
-    LOGGER.info("Loaded %s objects from NASA dataset", len(objects))
-    return objects
+        if obj is None:
+            continue
+        hostname = (record.get("hostname") or obj.name).strip()
+        hosts.setdefault(hostname, obj.model_copy(update={"name": hostname}))
+        rows.setdefault(hostname, []).append(PlanetRow(
+            record_id=idx,
+            name=obj.name,
+            spectral_type=None if obj.spectral_type == "Unknown" else obj.spectral_type,
+        ))
+    return [_fold_rows(host, rows[hostname]) for hostname, host in hosts.items()]
+
+
+def _host_prefix(host: AstronomicalObject, limit: int) -> AstronomicalObject:
+    """Return ``host`` as a ``limit``-record fetch would have built it."""
+    rows = [row for row in host.rows if row.record_id <= limit]
+    return host if len(rows) == len(host.rows) else _fold_rows(host, rows)
+
+
+def _load_from_nasa(
+    force_refresh: bool = False, limit: int | None = None,
+) -> Tuple[List[AstronomicalObject], str]:
+    """Return host records for ``limit`` rows and the ``fetched_at`` stamp of their fetch."""
+    records, fetched_at = NASA_CLIENT.get_records(force_refresh=force_refresh, limit=limit)
+    objects = _group_by_host(records)
+    LOGGER.info(
+        "Loaded %s host records from %s NASA rows", len(objects), len(records),
+    )
+    return objects, fetched_at
+
+
+class SnapshotRegistry:  # pylint: disable=too-many-instance-attributes
+    """Dataset snapshots keyed by NASA record limit, with row-budget LRU eviction.
+
+    The TAP query is ordered by ``sy_vmag`` and host ids are the 1-based record position of
+    their first row, so a snapshot for a smaller limit is the prefix ``id <= limit`` of any
+    larger snapshot (with child rows past ``limit`` dropped) and is derived without
+    refetching. Requests pick a snapshot by limit instead of mutating
+    the shared NASA client.
+
+    Generations identify the data, not the build: the fetch epoch is the ``fetched_at``
+    stamp of the NASA fetch the rows came from (shared through the cache file by every
+    worker process), and each ``(epoch, limit)`` keeps its generation, so rebuilding an
+    evicted limit or re-slicing the same prefix announces no change.
+    """
+
+    def __init__(self, default_limit: int, max_rows: int) -> None:
+        self.default_limit = default_limit
+        self.max_rows = max_rows
+        self._snapshots: OrderedDict[int, Dataset] = OrderedDict()
+        self._generations = count(1)
+        self._epoch = ""
+        self._versions: Dict[Tuple[str, int], int] = {}
+        self._lock = Lock()
+        self._build_lock = Lock()
+        self._listeners: List[Callable[[int, Dataset], None]] = []
+
+    def get(self, limit: int | None = None, *, force_refresh: bool = False) -> Dataset:
+        """Return the snapshot for ``limit`` (default limit when ``None``)."""
+        limit = limit or self.default_limit
+        if not force_refresh:
+            cached = self._cached(limit)
+            if cached is not None:
+                return cached
+
+        with self._build_lock:
+            if not force_refresh:
+                cached = self._cached(limit)
+                if cached is not None:
+                    return cached
+            source = None if force_refresh else self._covering(limit)
+            if source is not None:
+                objects = [_host_prefix(obj, limit) for obj in source.objects if obj.id <= limit]
+                epoch = self._epoch_of(source.generation)
+            else:
+                objects, epoch = _load_from_nasa(force_refresh=force_refresh, limit=limit)
+                self._epoch = epoch
+            dataset = Dataset.from_objects(objects, generation=self._generation(epoch, limit))
+
+        with self._lock:
+            if force_refresh:
+                self._snapshots.clear()
+            self._snapshots[limit] = dataset
+            self._evict(keep=limit)
+        LOGGER.info(
+            "Built dataset snapshot for limit=%s with %s objects (%s)",
+            limit, len(dataset), "prefix" if source is not None else "fetched",
+        )
+        for listener in self._listeners:
+            listener(limit, dataset)
+        return dataset
+
+    def add_listener(self, listener: Callable[[int, Dataset], None]) -> None:
+        """Call ``listener(limit, dataset)`` after every snapshot build."""
+        self._listeners.append(listener)
+
+    def _generation(self, epoch: str, limit: int) -> int:
+        """Return the generation of ``limit`` records from fetch ``epoch``; hold the build lock."""
+        key = (epoch, limit)
+        if key not in self._versions:
+            with self._lock:
+                live = {dataset.generation for dataset in self._snapshots.values()}
+            self._versions = {
+                version: generation for version, generation in self._versions.items()
+                if version[0] == self._epoch or generation in live
+            }
+            self._versions[key] = next(self._generations)
+        return self._versions[key]
+
+    def _epoch_of(self, generation: int) -> str:
+        for (epoch, _), known in self._versions.items():
+            if known == generation:
+                return epoch
+        return self._epoch
+
+    def _cached(self, limit: int) -> Dataset | None:
+        with self._lock:
+            dataset = self._snapshots.get(limit)
+            if dataset is not None:
+                self._snapshots.move_to_end(limit)
+            return dataset
+
+    def _covering(self, limit: int) -> Dataset | None:
+        with self._lock:
+            larger = [key for key in self._snapshots if key > limit]
+            return self._snapshots[min(larger)] if larger else None
+
+    def _evict(self, keep: int) -> None:
+        total = sum(len(dataset) for dataset in self._snapshots.values())
+        for key in list(self._snapshots):
+            if total <= self.max_rows:
+                break
+            if key != keep:
+                total -= len(self._snapshots.pop(key))
+                LOGGER.info("Evicted dataset snapshot for limit=%s", key)
+
+    def peek(self, limit: int | None = None) -> Dataset | None:
+        """Return the resident snapshot for ``limit`` without building it."""
+        return self._cached(limit or self.default_limit)
+
+    def resident(self) -> List[Dataset]:
+        """Return every resident snapshot."""
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def items(self) -> List[Tuple[int, Dataset]]:
+        """Return ``(limit, snapshot)`` pairs, least recently used first."""
+        with self._lock:
+            return list(self._snapshots.items())
+
+    def limits(self) -> List[int]:
+        """Return the limits with a resident snapshot, least recently used first."""
+        with self._lock:
+            return list(self._snapshots)
+
+    def clear(self) -> None:
+        """Drop every snapshot."""
+        with self._lock:
+            self._snapshots.clear()
+
+
+SNAPSHOTS = SnapshotRegistry(
+    default_limit=settings.nasa_max_records, max_rows=settings.snapshot_max_rows,
+)
+
+
+def load_dataset(limit: int | None = None, *, force_refresh: bool = False) -> Dataset:
+    """Return the columnar snapshot for ``limit`` records (the default limit when ``None``)."""
+    return SNAPSHOTS.get(limit, force_refresh=force_refresh)
 
 
-@lru_cache(maxsize=1)
 def load_objects(*, force_refresh: bool = False) -> List[AstronomicalObject]:
-    """Return the full list of parsed astronomical objects, cached in memory."""
-    return _load_from_nasa(force_refresh=force_refresh)
+    """Return the parsed astronomical objects of the default snapshot."""
+    return list(load_dataset(force_refresh=force_refresh).objects)
 
 
 def clear_cache() -> None:
-    """Clear the in-memory cache of loaded objects."""
-    load_objects.cache_clear()
+    """Clear the in-memory dataset snapshots."""
+    SNAPSHOTS.clear()
     LOGGER.info("Cleared objects cache")
@@ -0,0 +1,152 @@
+"""Immutable columnar view over the loaded astronomical objects."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from math import isnan, nan
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from . import bitmaps
+from .models import AstronomicalObject
+from .neighbors import NeighborIndex
+from .sketches import KLLSketch
+from .spectral import (
+    LUMINOSITY_CLASSES,
+    TEMPERATURE_CLASSES,
+    UNKNOWN_CODE,
+    encode_luminosity_class,
+    encode_temperature_class,
+    parse_spectral_type,
+)
+
+# Serialized fields only; excluded fields (a host's child rows) stay on the objects.
+COLUMNS: Tuple[str, ...] = tuple(
+    name for name, info in AstronomicalObject.model_fields.items() if not info.exclude
+)
+INTEGER_COLUMNS = frozenset({"id", "planet_count"})
+NUMERIC_COLUMNS = INTEGER_COLUMNS | {"magnitude", "distance_ly"}
+RANGE_INDEXED_COLUMNS = ("magnitude", "distance_ly", "spectral_subclass")
+FACET_COLUMNS = ("constellation", "spectral_type", "spectral_class", "luminosity_class")
+SKETCHED_COLUMNS = ("magnitude", "distance_ly")
+# Parsed spectral fields stored as compact codes: (column, code -> label table).
+ENCODED_COLUMNS = {
+    "spectral_class": TEMPERATURE_CLASSES,
+    "luminosity_class": LUMINOSITY_CLASSES,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Dataset:  # pylint: disable=too-many-instance-attributes
+    """Read-only snapshot of the dataset stored both as objects and as columns.
+
+    Numeric columns are packed ``array`` buffers and string columns are tuples, so scans
+    and exports touch compact per-field storage instead of pydantic models. Range-filtered
+    columns also keep a sorted copy with the matching row positions for bisect lookups, and
+    categorical columns keep one row bitmap per distinct value. Spectral types are parsed
+    into encoded ``spectral_class``/``luminosity_class`` codes (``-1`` when unknown) and a
+    ``spectral_subclass`` float column (NaN when unknown). A KD-tree over magnitude and log
+    distance answers similarity queries, and KLL sketches answer quantile queries.
+    """
+
+    generation: int
+    objects: Tuple[AstronomicalObject, ...]
+    columns: Dict[str, Sequence] = field(default_factory=dict)
+    sorted_columns: Dict[str, Tuple[array, array]] = field(default_factory=dict)
+    value_bitmaps: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    id_positions: Dict[int, int] = field(default_factory=dict)
+    neighbor_index: NeighborIndex | None = None
+    sketches: Dict[str, KLLSketch] = field(default_factory=dict)
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[AstronomicalObject], generation: int = 0) -> Dataset:
+        """Build the columnar snapshot for ``objects``."""
+        rows = tuple(objects)
+        columns: Dict[str, Sequence] = {}
+        for name in COLUMNS:
+            values = [getattr(obj, name) for obj in rows]
+            if name in INTEGER_COLUMNS:
+                columns[name] = array("q", values)
+            elif name in NUMERIC_COLUMNS:
+                columns[name] = array("d", values)
+            else:
+                columns[name] = tuple(values)
+
+        parsed = [parse_spectral_type(value) for value in columns["spectral_type"]]
+        columns["spectral_class"] = array("b", (
+            encode_temperature_class(spec.temperature_class if spec else None) for spec in parsed
+        ))
+        columns["spectral_subclass"] = array("d", (
+            spec.subclass if spec and spec.subclass is not None else nan for spec in parsed
+        ))
+        columns["luminosity_class"] = array("b", (
+            encode_luminosity_class(spec.luminosity_class if spec else None) for spec in parsed
+        ))
+
+        sorted_columns: Dict[str, Tuple[array, array]] = {}
+        for name in RANGE_INDEXED_COLUMNS:
+            values = columns[name]
+            order = sorted(
+                (pos for pos in range(len(rows)) if not isnan(values[pos])),
+                key=values.__getitem__,
+            )
+            sorted_columns[name] = (array("d", (values[pos] for pos in order)), array("q", order))
+
+        value_bitmaps: Dict[str, Dict[str, int]] = {}
+        for name in FACET_COLUMNS:
+            labels = ENCODED_COLUMNS.get(name)
+            value_positions: Dict[str, List[int]] = {}
+            for pos, value in enumerate(columns[name]):
+                if labels is not None:
+                    if value == UNKNOWN_CODE:
+                        continue
+                    value = labels[value]
+                value_positions.setdefault(value, []).append(pos)
+            value_bitmaps[name] = {
+                value: bitmaps.from_positions(positions, len(rows))
+                for value, positions in value_positions.items()
+            }
+        return cls(
+            generation=generation,
+            objects=rows,
+            columns=columns,
+            sorted_columns=sorted_columns,
+            value_bitmaps=value_bitmaps,
+            id_positions={obj_id: pos for pos, obj_id in enumerate(columns["id"])},
+            neighbor_index=NeighborIndex(columns["magnitude"], columns["distance_ly"]),
+            sketches={name: KLLSketch.from_values(columns[name]) for name in SKETCHED_COLUMNS},
+        )
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def column(self, name: str) -> Sequence:
+        """Return the column named after an ``AstronomicalObject`` field."""
+        return self.columns[name]
+
+    def range_positions(
+        self, name: str, low: float | None = None, high: float | None = None,
+    ) -> array:
+        """Return positions of rows with ``low <= value <= high`` via the sorted index.
+
+        Positions come back in value order, not row order.
+        """
+        values, positions = self.sorted_columns[name]
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+        return positions[start:end]
+
+    def value_mask(self, name: str, value: str) -> int:
+        """Return the bitmap of rows whose ``name`` column equals ``value`` (case-insensitive)."""
+        target = value.lower()
+        mask = 0
+        for candidate, bitmap in self.value_bitmaps[name].items():
+            if candidate.lower() == target:
+                mask |= bitmap
+        return mask
+
+    def rows(self, positions: Sequence[int]) -> Iterable[Tuple]:
+        """Yield row tuples in ``COLUMNS`` order for the given row positions."""
+        columns = [self.columns[name] for name in COLUMNS]
+        for pos in positions:
+            yield tuple(column[pos] for column in columns)
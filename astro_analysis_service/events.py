@@ -0,0 +1,88 @@
+"""Server-Sent Events broker for dataset-change and refresh-progress notifications."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, Set
+
+from prometheus_client import Gauge
+
+LOGGER = logging.getLogger(__name__)
+
+SUBSCRIBERS_GAUGE = Gauge(
+    "astro_event_subscribers",
+    "Clients currently connected to the /events stream.",
+)
+KEEPALIVE_SECONDS = 15.0
+# Browser reconnect delay after a dropped stream (e.g. a subscriber that fell behind).
+RECONNECT_MILLISECONDS = 1000
+SUBSCRIBER_BUFFER = 64
+
+
+def format_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one SSE frame."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class _Subscriber:
+    """A bounded per-connection queue bound to the loop that serves the connection."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_BUFFER)
+        self.overflowed = False
+
+    def offer(self, frame: str) -> None:
+        """Queue ``frame``; runs on the subscriber's loop."""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # A client that cannot keep up is dropped; EventSource reconnects and resyncs.
+            self.overflowed = True
+
+
+class EventBroker:
+    """Fans events out to every connected stream; ``publish`` is safe from any thread."""
+
+    def __init__(self) -> None:
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = Lock()
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Queue ``event`` for every subscriber."""
+        frame = format_event(event, data)
+        with self._lock:
+            subscribers = tuple(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, frame)
+            except RuntimeError:  # loop already closed; the stream is gone
+                self._discard(subscriber)
+
+    def _discard(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            SUBSCRIBERS_GAUGE.set(len(self._subscribers))
+
+    async def stream(
+        self, initial: str | None = None, keepalive: float = KEEPALIVE_SECONDS,
+    ) -> AsyncIterator[str]:
+        """Yield SSE frames until the client disconnects, starting with ``initial``."""
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            SUBSCRIBERS_GAUGE.set(len(self._subscribers))
+        try:
+            yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+            if initial is not None:
+                yield initial
+            while not subscriber.overflowed:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+            LOGGER.warning("Dropped an event stream that fell %s events behind", SUBSCRIBER_BUFFER)
+        finally:
+            self._discard(subscriber)
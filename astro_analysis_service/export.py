@@ -0,0 +1,104 @@
+"""Chunked serializers for streaming bulk exports of the filtered dataset."""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List
+
+from .dataset import COLUMNS, Dataset
+
+try:  # pragma: no cover - exercised only when the optional extra is installed
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+
+class ExportFormatUnavailable(RuntimeError):
+    """Raised when an export format needs an optional dependency that is missing."""
+
+
+def iter_ndjson(dataset: Dataset, chunks: Iterable[List[int]]) -> Iterator[bytes]:
+    """Yield one newline-delimited JSON block per chunk of row positions."""
+    for positions in chunks:
+        lines = [
+            json.dumps(dict(zip(COLUMNS, row)), separators=(",", ":"))
+            for row in dataset.rows(positions)
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(dataset: Dataset, chunks: Iterable[List[int]]) -> Iterator[bytes]:
+    """Yield a CSV header followed by one block of rows per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+    for positions in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(dataset.rows(positions))
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents are handed off after every record batch."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._buffer += data
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the previous drain."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_arrow(dataset: Dataset, chunks: Iterable[List[int]]) -> Iterator[bytes]:
+    """Yield an Arrow IPC stream with one record batch per chunk."""
+    schema = pyarrow.schema([
+        ("id", pyarrow.int64()),
+        ("name", pyarrow.string()),
+        ("constellation", pyarrow.string()),
+        ("magnitude", pyarrow.float64()),
+        ("distance_ly", pyarrow.float64()),
+        ("spectral_type", pyarrow.string()),
+        ("planet_count", pyarrow.int64()),
+    ])
+    sink = _DrainableSink()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for positions in chunks:
+            arrays = [
+                pyarrow.array(
+                    [dataset.column(name)[pos] for pos in positions],
+                    type=schema.field(name).type,
+                )
+                for name in COLUMNS
+            ]
+            writer.write_batch(pyarrow.record_batch(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_export(fmt: str, dataset: Dataset, chunks: Iterable[List[int]]) -> Iterator[bytes]:
+    """Dispatch to the serializer for ``fmt``, failing fast if it cannot be produced."""
+    if fmt == "arrow" and pyarrow is None:
+        raise ExportFormatUnavailable("Arrow export requires the optional 'pyarrow' package")
+    serializers = {"ndjson": iter_ndjson, "csv": iter_csv, "arrow": iter_arrow}
+    return serializers[fmt](dataset, chunks)
@@ -5,33 +5,70 @@ import logging
 import time
 import uuid
 from pathlib import Path
+from typing import Literal
 
-from fastapi import FastAPI, HTTPException, Query, Request, status
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from prometheus_client import Gauge
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from .__version__ import __version__
-from .data_loader import load_objects, clear_cache
+from .admission import AdmissionGate, AdmissionMiddleware
+from .compression import (
+    CompressionMiddleware,
+    PrecompressedJSONCache,
+    PrecompressedStaticFiles,
+    precompress_directory,
+)
+from .config import settings
+from .data_loader import SNAPSHOTS, load_dataset
+from .dataset import Dataset
+from .events import EventBroker, format_event
+from .export import EXPORT_FORMATS, ExportFormatUnavailable, iter_export
 from .logging_config import configure_logging
-from .models import HealthResponse, PaginatedObjectsResponse, ReadinessResponse, StatsResponse
-from .nasa_client import NASA_CLIENT
+from .models import (
+    BatchQueryRequest,
+    BatchQueryResponse,
+    FacetCountsResponse,
+    HealthResponse,
+    HostPlanetsResponse,
+    NeighborsResponse,
+    ObjectQueryParams,
+    PaginatedObjectsResponse,
+    ReadinessResponse,
+    StatsResponse,
+)
+from .offload import AnalyticsPool
+from .profiling import (
+    ProfilerBusy,
+    SamplingProfiler,
+    TracemallocSession,
+    footprint,
+)
 from .service import (
+    cached_filter_sketches,
     compute_stats,
+    evaluate_batch,
+    facet_counts,
     filter_objects,
     get_distance_distribution,
+    get_group_aggregates,
     get_magnitude_distance_correlation,
     get_magnitude_distribution,
+    get_quantiles,
     get_spectral_type_breakdown,
+    iter_filtered_positions,
+    nearest_objects,
     paginate_objects,
 )
 
 BASE_DIR = Path(__file__).resolve().parent
 FRONTEND_DIST = BASE_DIR / "static" / "app"
 FRONTEND_INDEX = FRONTEND_DIST / "index.html"
+EXPORT_CHUNK_SIZE = 500
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 configure_logging()
 logger = logging.getLogger("astro.analysis.api")
@@ -40,10 +77,78 @@ DATASET_GAUGE = Gauge(
     "Number of astronomical objects currently cached and available to the API.",
 )
 
+ANALYSIS_CACHE = PrecompressedJSONCache(minimum_size=settings.compression_min_size)
+ANALYTICS_POOL = AnalyticsPool(settings.analytics_workers, SNAPSHOTS.resident)
+EVENTS = EventBroker()
+PROFILER = SamplingProfiler()
+TRACEMALLOC = TracemallocSession()
+
+
+def _snapshot_event(limit: int, dataset: Dataset) -> dict:
+    return {
+        "limit": limit,
+        "generation": dataset.generation,
+        "count": len(dataset),
+        "default_limit": SNAPSHOTS.default_limit,
+    }
+
+
+SNAPSHOTS.add_listener(lambda limit, dataset: EVENTS.publish(
+    "dataset", _snapshot_event(limit, dataset),
+))
+
+STANDARD_GATE = AdmissionGate(
+    "standard",
+    settings.admission_standard_concurrency,
+    settings.admission_standard_queue,
+    timeout=settings.admission_queue_timeout,
+    retry_after=settings.admission_retry_after,
+)
+HEAVY_GATE = AdmissionGate(
+    "heavy",
+    settings.admission_heavy_concurrency,
+    settings.admission_heavy_queue,
+    timeout=settings.admission_queue_timeout,
+    retry_after=settings.admission_retry_after,
+)
+ADMIN_GATE = AdmissionGate(
+    "admin",
+    settings.admission_admin_concurrency,
+    settings.admission_admin_queue,
+    timeout=settings.admission_queue_timeout,
+    retry_after=settings.admission_retry_after,
+    reject_status=status.HTTP_429_TOO_MANY_REQUESTS,
+)
+# Profiling gets its own gate so a long CPU profile never blocks /admin/refresh-data.
+PROFILE_GATE = AdmissionGate(
+    "profile",
+    settings.admission_profile_concurrency,
+    settings.admission_profile_queue,
+    timeout=settings.admission_queue_timeout,
+    retry_after=settings.admission_retry_after,
+    reject_status=status.HTTP_429_TOO_MANY_REQUESTS,
+)
+# First matching prefix wins; health probes, metrics and static assets are never gated.
+ADMISSION_ROUTES = (
+    ("/admin/profile/", PROFILE_GATE),
+    ("/admin/", ADMIN_GATE),
+    ("/analysis/", HEAVY_GATE),
+    ("/objects/export", HEAVY_GATE),
+    ("/query/", HEAVY_GATE),
+    ("/objects", STANDARD_GATE),
+    ("/stats", STANDARD_GATE),
+)
+
 app = FastAPI(title="Astro Analysis Service", version=__version__)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+app.add_middleware(AdmissionMiddleware, routes=ADMISSION_ROUTES)
 
 if FRONTEND_DIST.exists():
-    app.mount("/app", StaticFiles(directory=str(FRONTEND_DIST), html=True), name="spa")
+    if settings.precompress_static:
+        precompress_directory(FRONTEND_DIST, minimum_size=settings.compression_min_size)
+    app.mount(
+        "/app", PrecompressedStaticFiles(directory=str(FRONTEND_DIST), html=True), name="spa",
+    )
 
 Instrumentator().instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
 
@@ -86,8 +191,7 @@ def legacy_dashboard(request: Request):
     return templates.TemplateResponse("terminal.html", {"request": request})
 
 
-@app.get("/objects", response_model=PaginatedObjectsResponse)
-def list_objects(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+async def object_filters(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     magnitude_min: float | None = Query(
         None, description="Include stars with magnitude >= this value.",
     ),
@@ -104,16 +208,21 @@ def list_objects(  # pylint: disable=too-many-arguments,too-many-positional-argu
         None, description="Exact constellation code (case-insensitive).",
     ),
     spectral_type: str | None = Query(
-        None, description="Exact spectral class (case-insensitive).",
+        None,
+        description="Exact spectral type (case-insensitive); K* or G2* match parsed classes.",
     ),
     search: str | None = Query(
         None, description="Substring match against name or constellation.",
     ),
-    page: int = Query(1, ge=1, description="Page number (1-indexed)."),
-    page_size: int = Query(25, ge=1, le=100, description="Rows per page."),
-):
-    """Return a paginated, filtered list of astronomical objects."""
-    filtered = filter_objects(
+    spectral_class: str | None = Query(
+        None, description="Temperature class parsed from the spectral type, e.g. G.",
+    ),
+    luminosity: str | None = Query(
+        None, description="Luminosity class parsed from the spectral type, e.g. V or III.",
+    ),
+) -> ObjectQueryParams:
+    """Collect the shared object filter query parameters."""
+    return ObjectQueryParams(
         magnitude_min=magnitude_min,
         magnitude_max=magnitude_max,
         distance_min=distance_min,
@@ -121,7 +230,37 @@ def list_objects(  # pylint: disable=too-many-arguments,too-many-positional-argu
         constellation=constellation,
         spectral_type=spectral_type,
         search=search,
+        spectral_class=spectral_class,
+        luminosity=luminosity,
     )
+
+
+async def dataset_snapshot(
+    limit: int | None = Query(
+        None, ge=10, le=1000,
+        description="NASA record limit of the snapshot to query; defaults to the active limit.",
+    ),
+) -> Dataset:
+    """Resolve the dataset snapshot a request runs against.
+
+    Resident snapshots are immutable and returned on the event loop; only a build (which
+    may hit the NASA archive) is pushed to the threadpool.
+    """
+    dataset = SNAPSHOTS.peek(limit)
+    if dataset is None:
+        dataset = await run_in_threadpool(load_dataset, limit)
+    return dataset
+
+
+@app.get("/objects", response_model=PaginatedObjectsResponse)
+async def list_objects(
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+    page: int = Query(1, ge=1, description="Page number (1-indexed)."),
+    page_size: int = Query(25, ge=1, le=100, description="Rows per page."),
+):
+    """Return a paginated, filtered list of astronomical objects."""
+    filtered = filter_objects(**filters.model_dump(), dataset=dataset)
     items, total, pages = paginate_objects(filtered, page=page, page_size=page_size)
     return PaginatedObjectsResponse(
         items=items,
@@ -132,14 +271,122 @@ def list_objects(  # pylint: disable=too-many-arguments,too-many-positional-argu
     )
 
 
+@app.get("/objects/export")
+async def export_objects(
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+    export_format: Literal["ndjson", "csv", "arrow"] = Query(
+        "ndjson", alias="format", description="Output format.",
+    ),
+):
+    """Stream every object matching the filters as NDJSON, CSV or an Arrow IPC stream."""
+    chunks = iter_filtered_positions(dataset, EXPORT_CHUNK_SIZE, **filters.model_dump())
+    try:
+        body = iter_export(export_format, dataset, chunks)
+    except ExportFormatUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc),
+        ) from exc
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="objects.{extension}"'},
+    )
+
+
+@app.get("/objects/facets", response_model=FacetCountsResponse)
+async def object_facets(
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+    fields: list[
+        Literal["constellation", "spectral_type", "spectral_class", "luminosity_class"]
+    ] = Query(
+        ["constellation", "spectral_type"], description="Categorical fields to count.",
+    ),
+):
+    """Return per-value counts for categorical fields under the other active filters."""
+    total, facets = facet_counts(dataset, fields, **filters.model_dump())
+    return FacetCountsResponse(total=total, facets=facets)
+
+
+@app.get("/objects/nearest", response_model=NeighborsResponse)
+async def nearest_objects_endpoint(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    magnitude: float = Query(
+        ..., allow_inf_nan=False, description="Apparent magnitude of the query point.",
+    ),
+    distance_ly: float = Query(
+        ..., gt=0, allow_inf_nan=False, description="Distance of the query point (ly).",
+    ),
+    k: int = Query(10, ge=1, le=100, description="Number of neighbours to return."),
+    radius: float | None = Query(
+        None, gt=0, description="Return everything within this separation instead of k.",
+    ),
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+):
+    """Return the objects nearest to a point in magnitude / log-distance space."""
+    items = nearest_objects(
+        dataset, magnitude, distance_ly, k=k, radius=radius, **filters.model_dump(),
+    )
+    return NeighborsResponse(items=items)
+
+
+@app.get("/objects/{object_id}/neighbors", response_model=NeighborsResponse)
+async def object_neighbors(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    object_id: int,
+    k: int = Query(10, ge=1, le=100, description="Number of neighbours to return."),
+    radius: float | None = Query(
+        None, gt=0, description="Return everything within this separation instead of k.",
+    ),
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+):
+    """Return the objects most similar to an object by magnitude and log distance."""
+    position = dataset.id_positions.get(object_id)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Object {object_id} not found",
+        )
+    target = dataset.objects[position]
+    items = nearest_objects(
+        dataset, target.magnitude, target.distance_ly,
+        k=k, radius=radius, exclude_id=object_id, **filters.model_dump(),
+    )
+    return NeighborsResponse(items=items)
+
+
+@app.get("/objects/{object_id}/planets", response_model=HostPlanetsResponse)
+async def object_planets(object_id: int, dataset: Dataset = Depends(dataset_snapshot)):
+    """Return the planet rows folded into a host record."""
+    position = dataset.id_positions.get(object_id)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Object {object_id} not found",
+        )
+    host = dataset.objects[position]
+    return HostPlanetsResponse(
+        id=host.id, name=host.name, planet_count=host.planet_count, rows=host.rows,
+    )
+
+
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def batch_query(
+    request: BatchQueryRequest, dataset: Dataset = Depends(dataset_snapshot),
+):
+    """Evaluate many `/objects` or `/stats` filter sets in one request, in order."""
+    results = await ANALYTICS_POOL.run(dataset, evaluate_batch, request.queries)
+    return BatchQueryResponse(results=results)
+
+
 @app.get("/stats", response_model=StatsResponse)
-def stats():
+async def stats(dataset: Dataset = Depends(dataset_snapshot)):
     """Return statistical summary of the full dataset."""
-    return compute_stats()
+    return compute_stats(dataset.objects)
 
 
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
-def health() -> HealthResponse:
+async def health() -> HealthResponse:
     """Liveness probe."""
     return HealthResponse(
         status="ok",
@@ -149,10 +396,10 @@ def health() -> HealthResponse:
 
 
 @app.get("/ready", response_model=ReadinessResponse, tags=["Health"])
-def readiness() -> ReadinessResponse:
+async def readiness() -> ReadinessResponse:
     """Readiness probe verifying dataset availability."""
     try:
-        dataset = load_objects()
+        dataset = await dataset_snapshot(None)
     except Exception as exc:  # pragma: no cover - surfaced through response
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -169,42 +416,131 @@ def readiness() -> ReadinessResponse:
     )
 
 
+async def _cached_analysis(
+    request: Request, dataset: Dataset, key: tuple, func, *args, **kwargs,
+):
+    """Serve ``func``'s payload from the precompressed cache, computing misses off-loop."""
+    return await ANALYSIS_CACHE.respond(
+        (*key, dataset.generation),
+        request.headers.get("accept-encoding", ""),
+        lambda: ANALYTICS_POOL.run(dataset, func, *args, **kwargs),
+    )
+
+
 @app.get("/analysis/magnitude-distribution", tags=["Analysis"])
-def magnitude_distribution(
+async def magnitude_distribution(
+    request: Request,
     bins: int = Query(10, ge=5, le=50, description="Number of bins"),
+    dataset: Dataset = Depends(dataset_snapshot),
 ):
     """Get magnitude distribution histogram data."""
-    return get_magnitude_distribution(bins=bins)
+    return await _cached_analysis(
+        request, dataset, ("magnitude-distribution", bins), get_magnitude_distribution, bins,
+    )
 
 
 @app.get("/analysis/spectral-breakdown", tags=["Analysis"])
-def spectral_breakdown():
+async def spectral_breakdown(request: Request, dataset: Dataset = Depends(dataset_snapshot)):
     """Get count of objects by spectral type."""
-    return get_spectral_type_breakdown()
+    return await _cached_analysis(
+        request, dataset, ("spectral-breakdown",), get_spectral_type_breakdown,
+    )
 
 
 @app.get("/analysis/distance-distribution", tags=["Analysis"])
-def distance_distribution(
+async def distance_distribution(
+    request: Request,
     bins: int = Query(10, ge=5, le=50, description="Number of bins"),
+    dataset: Dataset = Depends(dataset_snapshot),
 ):
     """Get distance distribution histogram data."""
-    return get_distance_distribution(bins=bins)
+    return await _cached_analysis(
+        request, dataset, ("distance-distribution", bins), get_distance_distribution, bins,
+    )
 
 
 @app.get("/analysis/magnitude-distance-correlation", tags=["Analysis"])
-def magnitude_distance_correlation():
+async def magnitude_distance_correlation(
+    request: Request, dataset: Dataset = Depends(dataset_snapshot),
+):
     """Get magnitude vs distance scatter plot data."""
-    return get_magnitude_distance_correlation()
+    return await _cached_analysis(
+        request, dataset, ("magnitude-distance-correlation",), get_magnitude_distance_correlation,
+    )
+
+
+@app.get("/analysis/quantiles", tags=["Analysis"])
+async def quantiles(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    request: Request,
+    column: Literal["magnitude", "distance_ly"] = Query(
+        "distance_ly", description="Column to summarise.",
+    ),
+    q: list[float] = Query(
+        [0.05, 0.25, 0.5, 0.75, 0.95], description="Quantiles to estimate, each in [0, 1].",
+    ),
+    bins: int | None = Query(
+        None, ge=2, le=50, description="Also return this many equal-count (quantile) bins.",
+    ),
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+):
+    """Get sketch-estimated percentiles and optional quantile bins for a column."""
+    if any(not 0 <= value <= 1 for value in q):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quantiles must be between 0 and 1",
+        )
+    active_filters = filters.model_dump(exclude_none=True)
+    return await _cached_analysis(
+        request,
+        dataset,
+        ("quantiles", column, tuple(q), bins, tuple(sorted(active_filters.items()))),
+        get_quantiles,
+        column,
+        q,
+        bins=bins,
+        **active_filters,
+    )
+
+
+@app.get("/analysis/groupby", tags=["Analysis"])
+async def group_by(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    request: Request,
+    by: Literal["constellation", "spectral_type", "spectral_class", "luminosity_class"] = Query(
+        ..., description="Categorical column to group by.",
+    ),
+    column: Literal["magnitude", "distance_ly", "planet_count"] = Query(
+        "magnitude", description="Numeric column to reduce per group.",
+    ),
+    agg: list[Literal["count", "min", "max", "mean"]] = Query(
+        ["count", "mean"], description="Aggregates per group; count is always included.",
+    ),
+    filters: ObjectQueryParams = Depends(object_filters),
+    dataset: Dataset = Depends(dataset_snapshot),
+):
+    """Get count/min/max/mean of a numeric column per value of a categorical column."""
+    active_filters = filters.model_dump(exclude_none=True)
+    return await _cached_analysis(
+        request,
+        dataset,
+        ("groupby", by, column, tuple(agg), tuple(sorted(active_filters.items()))),
+        get_group_aggregates,
+        by,
+        column,
+        tuple(agg),
+        **active_filters,
+    )
 
 
 class RefreshDataRequest(BaseModel):
     """Request body for refreshing data with custom limit."""
     limit: int
+    force: bool = False
 
 
 @app.post("/admin/refresh-data", tags=["Admin"])
 def refresh_data(request: RefreshDataRequest):
-    """Refresh dataset with a custom record limit."""
+    """Make ``limit`` the default snapshot, refetching from NASA when ``force`` is set."""
     limit = request.limit
 
     if limit < 10 or limit > 1000:
@@ -213,15 +549,13 @@ def refresh_data(request: RefreshDataRequest):
             detail="Limit must be between 10 and 1000"
         )
 
+    EVENTS.publish("refresh", {"stage": "started", "limit": limit, "force": request.force})
     try:
-        # Update the NASA client's max records
-        NASA_CLIENT.max_records = limit
-
-        # Clear the cache and force refresh
-        clear_cache()
-        dataset = load_objects(force_refresh=True)
+        dataset = load_dataset(limit, force_refresh=request.force)
+        SNAPSHOTS.default_limit = limit
 
         DATASET_GAUGE.set(len(dataset))
+        EVENTS.publish("refresh", {"stage": "completed", **_snapshot_event(limit, dataset)})
 
         logger.info(
             "Data refreshed with limit=%s, loaded %s objects",
@@ -237,7 +571,128 @@ def refresh_data(request: RefreshDataRequest):
         }
     except Exception as exc:
         logger.error("Failed to refresh data: %s", str(exc))
+        EVENTS.publish("refresh", {"stage": "failed", "limit": limit, "error": str(exc)})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to refresh data: {str(exc)}"
         ) from exc
+
+
+@app.get("/events", tags=["Events"])
+async def events(
+    limit: int | None = Query(
+        None, ge=10, le=1000, description="Announce this limit's snapshot on connect.",
+    ),
+):
+    """Stream `dataset` (snapshot built) and `refresh` (progress) Server-Sent Events.
+
+    The first `dataset` event describes the requested snapshot when it is resident, so a
+    client can compare generations and re-query only when they differ.
+    """
+    dataset = SNAPSHOTS.peek(limit)
+    initial = None
+    if dataset is not None:
+        initial = format_event(
+            "dataset", _snapshot_event(limit or SNAPSHOTS.default_limit, dataset),
+        )
+    return StreamingResponse(
+        EVENTS.stream(initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Registered only when ENABLE_PROFILING is set, so they are absent from the app and its schema.
+PROFILE_ROUTER = APIRouter(prefix="/admin/profile", tags=["Admin"])
+
+
+@PROFILE_ROUTER.post("/cpu", response_class=PlainTextResponse)
+def profile_cpu(
+    seconds: float = Query(5.0, gt=0, le=60, description="How long to sample for."),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Sampling interval."),
+    idle: bool = Query(False, description="Keep samples of parked threads."),
+):
+    """Sample every thread's stack for `seconds` and return collapsed stacks.
+
+    The output feeds straight into `flamegraph.pl`, speedscope or inferno.
+    """
+    try:
+        stacks = PROFILER.sample(seconds, interval_ms / 1000, include_idle=idle)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return PlainTextResponse(SamplingProfiler.format_collapsed(stacks))
+
+
+@PROFILE_ROUTER.post("/tracemalloc/start")
+def start_tracemalloc(
+    frames: int = Query(1, ge=1, le=25, description="Traceback depth per allocation."),
+):
+    """Start tracing allocations (adds overhead until stopped)."""
+    TRACEMALLOC.start(frames)
+    return {"tracing": True}
+
+
+@PROFILE_ROUTER.post("/tracemalloc/stop")
+def stop_tracemalloc():
+    """Stop tracing allocations and free the trace data."""
+    TRACEMALLOC.stop()
+    return {"tracing": False}
+
+
+@PROFILE_ROUTER.get("/tracemalloc")
+def tracemalloc_snapshot(
+    top: int = Query(25, ge=1, le=200, description="Number of allocation sites."),
+    key_type: Literal["lineno", "filename", "traceback"] = Query(
+        "lineno", description="How allocation sites are grouped.",
+    ),
+    compare: bool = Query(False, description="Diff against the previous snapshot."),
+):
+    """Return the top allocation sites from a tracemalloc snapshot."""
+    if not TRACEMALLOC.is_tracing():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="tracemalloc is not running; POST /admin/profile/tracemalloc/start",
+        )
+    return TRACEMALLOC.snapshot(top, key_type, compare=compare)
+
+
+@PROFILE_ROUTER.get("/memory")
+def memory_footprint():
+    """Report approximate bytes held by each snapshot's data and indexes and by the caches.
+
+    Objects shared between snapshots (prefix snapshots reuse host records) are attributed
+    to the first snapshot listed. Only this process is measured: with `ANALYTICS_WORKERS`
+    set, filtered sketches are cached inside the workers, so `filter_sketches` is omitted.
+    """
+    seen: set = set()
+    snapshots = []
+    for limit, dataset in reversed(SNAPSHOTS.items()):
+        parts, total = footprint({
+            "objects": dataset.objects,
+            "columns": dataset.columns,
+            "sorted_columns": dataset.sorted_columns,
+            "value_bitmaps": dataset.value_bitmaps,
+            "id_positions": dataset.id_positions,
+            "neighbor_index": dataset.neighbor_index,
+            "sketches": dataset.sketches,
+        }, seen)
+        snapshots.append({
+            "limit": limit,
+            "generation": dataset.generation,
+            "rows": len(dataset),
+            "bytes": parts,
+            "total_bytes": total,
+        })
+    cache_parts = {"analysis_responses": ANALYSIS_CACHE}
+    if not ANALYTICS_POOL.workers:
+        cache_parts["filter_sketches"] = cached_filter_sketches()
+    caches, caches_total = footprint(cache_parts, seen)
+    return {
+        "snapshots": snapshots,
+        "caches": caches,
+        "total_bytes": sum(item["total_bytes"] for item in snapshots) + caches_total,
+    }
+
+
+if settings.profiling_enabled:
+    app.include_router(PROFILE_ROUTER)
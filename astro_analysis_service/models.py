@@ -6,6 +6,14 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 
+class PlanetRow(BaseModel):
+    """One ``ps`` row (a planet parameter set) folded into its host record."""
+
+    record_id: int = Field(..., description="1-based position in the TAP result")
+    name: str
+    spectral_type: str | None = None
+
+
 class AstronomicalObject(BaseModel):
     """A single astronomical object (exoplanet host star)."""
 
@@ -15,6 +23,10 @@ class AstronomicalObject(BaseModel):
     magnitude: float
     distance_ly: float = Field(..., description="Distance in light years")
     spectral_type: str
+    planet_count: int = Field(1, description="Distinct planets known around this host")
+    rows: list[PlanetRow] = Field(
+        default_factory=list, exclude=True, description="Child ps rows, in record order",
+    )
 
 
 class ObjectQueryParams(BaseModel):
@@ -36,11 +48,18 @@ class ObjectQueryParams(BaseModel):
         None, description="Exact constellation match (case-insensitive)",
     )
     spectral_type: str | None = Field(
-        None, description="Exact spectral class match (case-insensitive)",
+        None,
+        description="Exact spectral type match (case-insensitive), or a pattern such as K* or G2*",
     )
     search: str | None = Field(
         None, description="Substring match against name or constellation",
     )
+    spectral_class: str | None = Field(
+        None, description="Parsed temperature class (O, B, A, F, G, K, M, L, T, Y)",
+    )
+    luminosity: str | None = Field(
+        None, description="Parsed luminosity class (I-VII), e.g. V for dwarfs, III for giants",
+    )
 
 
 class PaginatedObjectsResponse(BaseModel):
@@ -53,6 +72,55 @@ class PaginatedObjectsResponse(BaseModel):
     items: list[AstronomicalObject]
 
 
+class BatchQuerySpec(ObjectQueryParams):
+    """One filter set inside a batch query, with its own pagination or aggregate."""
+
+    kind: Literal["objects", "stats"] = Field(
+        "objects", description="Return a page of objects or a stats summary",
+    )
+    page: int = Field(1, ge=1)
+    page_size: int = Field(25, ge=1, le=100)
+
+
+class BatchQueryRequest(BaseModel):
+    """Request body for evaluating several filter sets at once."""
+
+    queries: list[BatchQuerySpec] = Field(..., min_length=1, max_length=200)
+
+
+class FacetCountsResponse(BaseModel):
+    """Per-value match counts for categorical fields under a filter."""
+
+    total: int = Field(..., ge=0, description="Rows matching every filter")
+    facets: dict[str, dict[str, int]] = Field(
+        ..., description="Counts per field value, ignoring that field's own filter",
+    )
+
+
+class Neighbor(BaseModel):
+    """An object returned by a similarity query."""
+
+    object: AstronomicalObject
+    separation: float = Field(
+        ..., ge=0, description="Distance in normalised magnitude / log-distance space",
+    )
+
+
+class NeighborsResponse(BaseModel):
+    """Similarity query results, nearest first."""
+
+    items: list[Neighbor]
+
+
+class HostPlanetsResponse(BaseModel):
+    """A host record with the ``ps`` rows that were folded into it."""
+
+    id: int
+    name: str
+    planet_count: int
+    rows: list[PlanetRow]
+
+
 class StatsResponse(BaseModel):
     """Statistical summary of the dataset."""
 
@@ -76,3 +144,17 @@ class ReadinessResponse(HealthResponse):
     """Readiness probe response including dataset availability."""
 
     dataset_count: int | None = Field(None, ge=0)
+
+
+class BatchQueryResult(BaseModel):
+    """Result of one batch query spec; exactly one payload is set according to ``kind``."""
+
+    kind: Literal["objects", "stats"]
+    objects: PaginatedObjectsResponse | None = None
+    stats: StatsResponse | None = None
+
+
+class BatchQueryResponse(BaseModel):
+    """Batch query results, in request order."""
+
+    results: list[BatchQueryResult]
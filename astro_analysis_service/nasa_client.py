@@ -6,7 +6,7 @@ import logging
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Iterable, List, Sequence
+from typing import Any, Iterable, List, Sequence, Tuple
 
 import httpx
 
@@ -42,32 +42,48 @@ class NASAExoplanetClient:
         self.max_records = max_records or settings.nasa_max_records
         self.http_timeout = http_timeout
 
-    def get_objects(self, *, force_refresh: bool = False) -> List[dict[str, Any]]:
-        """Return cached or freshly fetched objects."""
-
-        cached = None if force_refresh else self._load_cache()
+    def get_objects(
+        self, *, force_refresh: bool = False, limit: int | None = None,
+    ) -> List[dict[str, Any]]:
+        """Return cached or freshly fetched objects.
+
+        ``limit`` defaults to ``max_records``. Because the query is ordered by ``sy_vmag``, a
+        cache fetched with a larger limit answers smaller limits with a prefix of its rows.
+        """
+        return self.get_records(force_refresh=force_refresh, limit=limit)[0]
+
+    def get_records(
+        self, *, force_refresh: bool = False, limit: int | None = None,
+    ) -> Tuple[List[dict[str, Any]], str]:
+        """Return ``(records, fetched_at)`` like :meth:`get_objects`.
+
+        ``fetched_at`` identifies the remote fetch the rows came from, so every process
+        sharing the cache file agrees on whether the data changed.
+        """
+        limit = limit or self.max_records
+        cached = None if force_refresh else self._load_cache(limit)
         if cached is not None:
-            LOGGER.debug("Loaded %s cached records from %s", len(cached), self.cache_path)
+            LOGGER.debug("Loaded %s cached records from %s", len(cached[0]), self.cache_path)
             return cached
 
         try:
-            records = list(self._fetch_remote())
+            records = list(self._fetch_remote(limit))
         except Exception:
             if cached is not None:
                 LOGGER.warning("Remote fetch failed, returning cached data", exc_info=True)
                 return cached
             raise
 
-        self._write_cache(records)
-        return records
+        return records, self._write_cache(records, limit)
 
     # ------------------------------------------------------------------
-    def _fetch_remote(self) -> Iterable[dict[str, Any]]:
+    def _fetch_remote(self, limit: int | None = None) -> Iterable[dict[str, Any]]:
         """Fetch exoplanet data from the NASA TAP endpoint with retries."""
-        query = QUERY_TEMPLATE.format(limit=self.max_records)
+        limit = limit or self.max_records
+        query = QUERY_TEMPLATE.format(limit=limit)
         LOGGER.info(
             "Fetching exoplanet data from NASA (limit=%s)",
-            self.max_records,
+            limit,
         )
 
         for attempt in range(MAX_RETRIES):
@@ -104,7 +120,9 @@ class NASAExoplanetClient:
                     raise
         return []  # unreachable; satisfies pylint consistent-return
 
-    def _load_cache(self) -> List[dict[str, Any]] | None:
+    def _load_cache(
+        self, limit: int | None = None,
+    ) -> Tuple[List[dict[str, Any]], str] | None:
         if not self.cache_path.exists():
             return None
         try:
@@ -122,13 +140,21 @@ class NASAExoplanetClient:
                 "Cache at %s expired", self.cache_path,
             )
             return None
-        return cache_payload.get("records", [])
+        records = cache_payload.get("records", [])
+        # Caches written before limits were recorded only vouch for the rows they hold.
+        if limit is not None and cache_payload.get("limit", len(records)) < limit:
+            LOGGER.info(
+                "Cache at %s holds fewer than %s records", self.cache_path, limit,
+            )
+            return None
+        return records[:limit], cache_payload.get("fetched_at", expires_at)
 
-    def _write_cache(self, records: Sequence[dict[str, Any]]) -> None:
-        """Persist records to the JSON cache file."""
+    def _write_cache(self, records: Sequence[dict[str, Any]], limit: int | None = None) -> str:
+        """Persist records to the JSON cache file and return their ``fetched_at`` stamp."""
         now = datetime.now(timezone.utc)
         payload = {
             "records": list(records),
+            "limit": limit or len(records),
             "fetched_at": now.isoformat(),
             "expires_at": (
                 now + timedelta(seconds=self.ttl_seconds)
@@ -137,6 +163,7 @@ class NASAExoplanetClient:
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
         with self.cache_path.open("w", encoding="utf-8") as handle:
             json.dump(payload, handle)
+        return payload["fetched_at"]
 
 
 NASA_CLIENT = NASAExoplanetClient()
@@ -0,0 +1,144 @@
+"""KD-tree nearest-neighbour index over normalised magnitude / log-distance space."""
+from __future__ import annotations
+
+import heapq
+from array import array
+from math import log10, sqrt
+from statistics import fmean, pstdev
+from typing import Callable, List, Sequence, Tuple
+
+Point = Tuple[float, float]
+Allowed = Callable[[int], bool] | None
+MIN_DISTANCE_LY = 1e-3
+
+
+class KDTree:
+    """Static 2-d tree whose nodes are stored in flat arrays.
+
+    Queries return ``(separation, position)`` pairs, nearest first, where ``position`` is the
+    index of the point in the sequence the tree was built from.
+    """
+
+    def __init__(self, points: Sequence[Point]) -> None:
+        self._points = list(points)
+        self._position = array("q")
+        self._left = array("q")
+        self._right = array("q")
+        self._root = self._build(list(range(len(self._points))), depth=0)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _build(self, positions: List[int], depth: int) -> int:
+        if not positions:
+            return -1
+        axis = depth % 2
+        positions.sort(key=lambda pos: self._points[pos][axis])
+        mid = len(positions) // 2
+        node = len(self._position)
+        self._position.append(positions[mid])
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(positions[:mid], depth + 1)
+        self._right[node] = self._build(positions[mid + 1:], depth + 1)
+        return node
+
+    def _search(
+        self, point: Point, accept: Callable[[float, int], None], bound: Callable[[], float],
+        allowed: Allowed,
+    ) -> None:
+        """Depth-first descent visiting the near side first and pruning by ``bound()``."""
+        # Each entry carries a lower bound on the squared separation of anything in its
+        # subtree, re-checked when popped because the bound tightens as points are accepted.
+        stack = [(self._root, 0, 0.0)] if self._root >= 0 else []
+        while stack:
+            node, depth, min_dist2 = stack.pop()
+            if min_dist2 > bound():
+                continue
+            pos = self._position[node]
+            candidate = self._points[pos]
+            if allowed is None or allowed(pos):
+                accept(
+                    (point[0] - candidate[0]) ** 2 + (point[1] - candidate[1]) ** 2, pos,
+                )
+            axis = depth % 2
+            diff = point[axis] - candidate[axis]
+            near, far = (
+                (self._left[node], self._right[node]) if diff < 0
+                else (self._right[node], self._left[node])
+            )
+            if far >= 0:
+                stack.append((far, depth + 1, max(min_dist2, diff * diff)))
+            if near >= 0:
+                stack.append((near, depth + 1, min_dist2))
+
+    def nearest(self, point: Point, k: int, allowed: Allowed = None) -> List[Tuple[float, int]]:
+        """Return up to ``k`` nearest allowed points."""
+        heap: List[Tuple[float, int]] = []
+
+        def accept(dist2: float, pos: int) -> None:
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist2, -pos))
+            elif (-dist2, -pos) > heap[0]:
+                heapq.heapreplace(heap, (-dist2, -pos))
+
+        def bound() -> float:
+            return -heap[0][0] if len(heap) >= k else float("inf")
+
+        self._search(point, accept, bound, allowed)
+        return sorted((sqrt(-dist2), -pos) for dist2, pos in heap)
+
+    def within(
+        self, point: Point, radius: float, allowed: Allowed = None,
+    ) -> List[Tuple[float, int]]:
+        """Return every allowed point within ``radius`` of ``point``."""
+        radius2 = radius * radius
+        found: List[Tuple[float, int]] = []
+
+        def accept(dist2: float, pos: int) -> None:
+            if dist2 <= radius2:
+                found.append((sqrt(dist2), pos))
+
+        self._search(point, accept, lambda: radius2, allowed)
+        return sorted(found)
+
+
+class NeighborIndex:
+    """KD-tree over (magnitude, log10 distance) after z-score normalisation of each axis.
+
+    Normalising keeps one magnitude step and one decade of distance comparable, so
+    separations are unitless standard deviations.
+    """
+
+    def __init__(self, magnitudes: Sequence[float], distances_ly: Sequence[float]) -> None:
+        log_distances = [log10(max(dist, MIN_DISTANCE_LY)) for dist in distances_ly]
+        self._offsets = (fmean(magnitudes), fmean(log_distances)) if magnitudes else (0.0, 0.0)
+        self._scales = (
+            (pstdev(magnitudes) or 1.0, pstdev(log_distances) or 1.0) if magnitudes
+            else (1.0, 1.0)
+        )
+        self.tree = KDTree([
+            self._normalise(mag, log_dist) for mag, log_dist in zip(magnitudes, log_distances)
+        ])
+
+    def _normalise(self, magnitude: float, log_distance: float) -> Point:
+        return (
+            (magnitude - self._offsets[0]) / self._scales[0],
+            (log_distance - self._offsets[1]) / self._scales[1],
+        )
+
+    def project(self, magnitude: float, distance_ly: float) -> Point:
+        """Map a raw (magnitude, distance in ly) pair into the index space."""
+        return self._normalise(magnitude, log10(max(distance_ly, MIN_DISTANCE_LY)))
+
+    def nearest(
+        self, magnitude: float, distance_ly: float, k: int, allowed: Allowed = None,
+    ) -> List[Tuple[float, int]]:
+        """Return the ``k`` nearest allowed rows as ``(separation, position)`` pairs."""
+        return self.tree.nearest(self.project(magnitude, distance_ly), k, allowed)
+
+    def within(
+        self, magnitude: float, distance_ly: float, radius: float, allowed: Allowed = None,
+    ) -> List[Tuple[float, int]]:
+        """Return every allowed row within ``radius`` separation, nearest first."""
+        return self.tree.within(self.project(magnitude, distance_ly), radius, allowed)
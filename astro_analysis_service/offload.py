@@ -0,0 +1,102 @@
+"""Process-pool offload for CPU-heavy analytics over shared, read-only dataset snapshots.
+
+Workers are forked, so they inherit the parent's resident snapshots copy-on-write instead
+of receiving pickled copies; a task only ships its snapshot generation, arguments and
+result. The pool is re-forked lazily, off the event loop, only when a task needs a
+snapshot the current workers did not inherit; the new workers share just the snapshots
+resident at that point. With no workers configured (or no ``fork`` start method) tasks
+run in the threadpool instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, Iterable
+
+from starlette.concurrency import run_in_threadpool
+
+from .dataset import Dataset
+
+LOGGER = logging.getLogger(__name__)
+
+# Snapshots visible to forked workers, keyed by generation. Filled only while a pool is
+# being forked, so the parent never keeps evicted snapshots alive.
+_SHARED_DATASETS: Dict[int, Dataset] = {}
+
+
+def _call(generation: int, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    """Worker entry point: run ``func`` against an inherited snapshot."""
+    return func(*args, dataset=_SHARED_DATASETS[generation], **kwargs)
+
+
+class AnalyticsPool:
+    """Runs ``func(*args, dataset=..., **kwargs)`` in forked workers, or the threadpool."""
+
+    def __init__(self, workers: int, resident: Callable[[], Iterable[Dataset]]) -> None:
+        if workers and "fork" not in multiprocessing.get_all_start_methods():
+            LOGGER.warning("fork is unavailable; running analytics in the threadpool")
+            workers = 0
+        self.workers = workers
+        self._resident = resident
+        self._executor: ProcessPoolExecutor | None = None
+        self._generations: FrozenSet[int] = frozenset()
+        self._lock = Lock()
+
+    def _shutdown(self, cancel_futures: bool = False) -> None:
+        """Drop the current workers; callers hold ``_lock``."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+        self._executor = None
+        self._generations = frozenset()
+        _SHARED_DATASETS.clear()
+
+    def _fork(self, snapshots: Iterable[Dataset]) -> None:
+        """Replace the workers with a fresh fork sharing ``snapshots``; hold ``_lock``."""
+        self._shutdown()
+        _SHARED_DATASETS.update({snapshot.generation: snapshot for snapshot in snapshots})
+        try:
+            executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("fork"),
+            )
+            # With fork, every worker is spawned on the first submit; once it completes the
+            # workers hold their own copies and the parent can drop its references.
+            executor.submit(int).result()
+            self._executor = executor
+            self._generations = frozenset(_SHARED_DATASETS)
+        finally:
+            _SHARED_DATASETS.clear()
+        LOGGER.info(
+            "Forked %s analytics workers sharing generations %s",
+            self.workers, sorted(self._generations),
+        )
+
+    def _submit(
+        self, dataset: Dataset, func: Callable[..., Any], args: tuple, kwargs: dict,
+    ) -> Future:
+        with self._lock:
+            if self._executor is None or dataset.generation not in self._generations:
+                self._fork([*self._resident(), dataset])
+            return self._executor.submit(_call, dataset.generation, func, args, kwargs)
+
+    async def run(
+        self, dataset: Dataset, func: Callable[..., Any], *args: Any, **kwargs: Any,
+    ) -> Any:
+        """Run ``func`` against ``dataset`` off the event loop and return its result."""
+        if self.workers:
+            try:
+                # Submitting may fork, which must not stall the event loop.
+                future = await run_in_threadpool(self._submit, dataset, func, args, kwargs)
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                LOGGER.warning("Analytics pool broke; retrying in the threadpool", exc_info=True)
+                self.close()
+        return await run_in_threadpool(func, *args, dataset=dataset, **kwargs)
+
+    def close(self) -> None:
+        """Shut the worker processes down; the next task forks a fresh pool."""
+        with self._lock:
+            self._shutdown(cancel_futures=True)
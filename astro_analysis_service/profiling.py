@@ -0,0 +1,196 @@
+"""On-demand CPU sampling, tracemalloc snapshots and object-size accounting.
+
+Nothing here runs until an admin endpoint asks for it: the sampler is a thread that exists
+only for the duration of one profile, and ``tracemalloc`` is off until explicitly started.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from collections import Counter, deque
+from types import FrameType, FunctionType, ModuleType
+from typing import Any, Dict, List, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Leaf frames that mean "this thread is parked", dropped unless idle samples are requested.
+_IDLE_LEAVES = frozenset({
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+})
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), array, range)
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, FrameType)
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a CPU profile is requested while another one is running."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(thread_name: str, frame: FrameType | None) -> str:
+    """Return ``thread;root;...;leaf`` for ``frame``, as used by flamegraph tools."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def _is_idle(frame: FrameType) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+class SamplingProfiler:
+    """Wall-clock sampler over every thread's stack via ``sys._current_frames``.
+
+    Samples are aggregated into collapsed stacks (one ``stack count`` line each), which
+    ``flamegraph.pl``, speedscope and inferno read directly. One profile runs at a time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def sample(
+        self, seconds: float, interval: float = 0.01, *, include_idle: bool = False,
+    ) -> Counter:
+        """Sample all other threads every ``interval`` seconds for ``seconds``."""
+        if not self._lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            raise ProfilerBusy("A CPU profile is already running")
+        try:
+            own = threading.get_ident()
+            stacks: Counter = Counter()
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                    if ident == own or (not include_idle and _is_idle(frame)):
+                        continue
+                    stacks[collapse_stack(names.get(ident, f"thread-{ident}"), frame)] += 1
+                time.sleep(interval)
+            LOGGER.info("CPU profile collected %s samples", sum(stacks.values()))
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def format_collapsed(stacks: Counter) -> str:
+        """Render stacks as collapsed-stack text, heaviest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class TracemallocSession:
+    """Start/stop ``tracemalloc`` and report top allocation sites, optionally as a diff."""
+
+    def __init__(self) -> None:
+        self._previous: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_tracing() -> bool:
+        """Return whether allocations are being traced."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        """Begin tracing allocations with ``frames`` frames of traceback each."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._previous = None
+
+    def stop(self) -> None:
+        """Stop tracing and drop the retained snapshot."""
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    def snapshot(
+        self, top: int = 25, key_type: str = "lineno", *, compare: bool = False,
+    ) -> Dict[str, Any]:
+        """Return the ``top`` allocation sites, diffed against the last snapshot if asked."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        with self._lock:
+            previous, self._previous = self._previous, snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        if compare and previous is not None:
+            stats = [
+                {
+                    "site": str(stat.traceback),
+                    "size": stat.size,
+                    "size_diff": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(previous, key_type)[:top]
+            ]
+        else:
+            stats = [
+                {"site": str(stat.traceback), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics(key_type)[:top]
+            ]
+        return {
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "compared": compare and previous is not None,
+            "top": stats,
+        }
+
+
+def _children(obj: Any) -> List[Any]:
+    if isinstance(obj, dict):
+        return [*obj.keys(), *obj.values()]
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return list(obj)
+    children = []
+    if hasattr(obj, "__dict__"):
+        children.extend(vars(obj).values())
+    for cls in type(obj).__mro__:
+        slots = getattr(cls, "__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot not in ("__dict__", "__weakref__") and hasattr(obj, slot):
+                children.append(getattr(obj, slot))
+    return children
+
+
+def deep_sizeof(*objs: Any, seen: set | None = None) -> int:
+    """Approximate bytes reachable from ``objs``, counting each object once.
+
+    Pass the same ``seen`` set across calls to attribute shared objects only to the first
+    caller. Classes, modules and functions are not followed.
+    """
+    seen = set() if seen is None else seen
+    pending: List[Any] = list(objs)
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if not isinstance(obj, _ATOMIC_TYPES):
+            pending.extend(_children(obj))
+    return total
+
+
+def footprint(parts: Dict[str, Any], seen: set | None = None) -> Tuple[Dict[str, int], int]:
+    """Return ``(bytes per part, total)``; parts are sized in order with shared ``seen``."""
+    seen = set() if seen is None else seen
+    sizes = {name: deep_sizeof(part, seen=seen) for name, part in parts.items()}
+    return sizes, sum(sizes.values())
@@ -1,13 +1,175 @@
 """Core filtering and statistics logic for the API."""
 from __future__ import annotations
 
-from collections import Counter
-from math import ceil
+from collections import Counter, OrderedDict
+from functools import partial, reduce
+from math import ceil, fsum, inf, nextafter
+from operator import or_
 from statistics import mean
-from typing import Dict, Iterable, List, Sequence, Tuple
+from threading import Lock
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Tuple,
+)
 
-from .data_loader import load_objects
-from .models import AstronomicalObject, StatsResponse
+from . import bitmaps
+from .data_loader import load_dataset, load_objects
+from .dataset import FACET_COLUMNS, NUMERIC_COLUMNS, SKETCHED_COLUMNS, Dataset
+from .models import (
+    AstronomicalObject,
+    BatchQueryResult,
+    BatchQuerySpec,
+    Neighbor,
+    ObjectQueryParams,
+    PaginatedObjectsResponse,
+    StatsResponse,
+)
+from .sketches import KLLSketch
+from .spectral import parse_spectral_type
+
+FILTER_FIELDS = tuple(ObjectQueryParams.model_fields)
+FILTER_SKETCH_CACHE_SIZE = 64
+_FILTER_SKETCHES: OrderedDict[Hashable, KLLSketch] = OrderedDict()
+_FILTER_SKETCHES_LOCK = Lock()
+
+
+def _resolve(dataset: Dataset | None) -> Dataset:
+    """Return ``dataset``, or the default snapshot when none was chosen."""
+    return load_dataset() if dataset is None else dataset
+
+
+def _search_mask(dataset: Dataset, search: str) -> int:
+    """Return rows whose name or constellation contains ``search`` (case-insensitive)."""
+    needle = search.lower()
+    names = dataset.column("name")
+    constellations = dataset.column("constellation")
+    return bitmaps.from_positions(
+        (
+            pos for pos in range(len(dataset))
+            if needle in f"{names[pos].lower()} {constellations[pos].lower()}"
+        ),
+        len(dataset),
+    )
+
+
+def _spectral_type_mask(dataset: Dataset, spectral_type: str) -> int:
+    """Resolve an exact spectral type, or a ``*``-suffixed pattern through the parsed index.
+
+    ``K*`` selects temperature class K, ``G2*`` subclasses 2 to <3 of G, and ``K1.5III*``
+    adds an exact subclass and a luminosity class. Patterns that do not parse fall back to a
+    prefix match over the distinct spectral type strings.
+    """
+    if not spectral_type.endswith("*"):
+        return dataset.value_mask("spectral_type", spectral_type)
+    prefix = spectral_type[:-1].strip()
+    parsed = parse_spectral_type(prefix) or parse_spectral_type(prefix.upper())
+    if parsed is None:
+        return reduce(or_, (
+            bitmap for value, bitmap in dataset.value_bitmaps["spectral_type"].items()
+            if value.lower().startswith(prefix.lower())
+        ), 0)
+
+    mask = dataset.value_mask("spectral_class", parsed.temperature_class)
+    if parsed.subclass is not None:
+        low = parsed.subclass
+        high = low if not low.is_integer() or "." in prefix else nextafter(low + 1, -inf)
+        mask &= bitmaps.from_positions(
+            dataset.range_positions("spectral_subclass", low, high), len(dataset),
+        )
+    if parsed.luminosity_class is not None:
+        mask &= dataset.value_mask("luminosity_class", parsed.luminosity_class)
+    return mask
+
+
+def filter_masks(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    dataset: Dataset,
+    magnitude_min: float | None = None,
+    magnitude_max: float | None = None,
+    distance_min: float | None = None,
+    distance_max: float | None = None,
+    constellation: str | None = None,
+    spectral_type: str | None = None,
+    search: str | None = None,
+    spectral_class: str | None = None,
+    luminosity: str | None = None,
+    *,
+    lookups: Dict[Hashable, int] | None = None,
+) -> Dict[str, int]:
+    """Return one row bitmap per active filter, keyed by the column it constrains.
+
+    Ranges resolve through the sorted column indexes, categorical and spectral filters
+    through the per-value bitmaps, and only ``search`` needs a scan. Bitmaps are memoised in
+    ``lookups`` so callers evaluating many filter sets can share them.
+    """
+    lookups = {} if lookups is None else lookups
+    size = len(dataset)
+    masks: Dict[str, int] = {}
+    for column, low, high in (
+        ("magnitude", magnitude_min, magnitude_max),
+        ("distance_ly", distance_min, distance_max),
+    ):
+        if low is None and high is None:
+            continue
+        key = (column, low, high)
+        if key not in lookups:
+            lookups[key] = bitmaps.from_positions(dataset.range_positions(column, low, high), size)
+        masks[column] = lookups[key]
+
+    resolvers: Tuple[Tuple[str, str | None, Callable[[str], int]], ...] = (
+        ("constellation", constellation, partial(dataset.value_mask, "constellation")),
+        ("spectral_type", spectral_type, partial(_spectral_type_mask, dataset)),
+        ("spectral_class", spectral_class, partial(dataset.value_mask, "spectral_class")),
+        ("luminosity_class", luminosity, partial(dataset.value_mask, "luminosity_class")),
+        ("search", search, partial(_search_mask, dataset)),
+    )
+    for column, value, resolve in resolvers:
+        if not value:
+            continue
+        key = (column, value.lower())
+        if key not in lookups:
+            lookups[key] = resolve(value)
+        masks[column] = lookups[key]
+    return masks
+
+
+def _intersect(masks: Iterable[int], size: int) -> int:
+    combined = bitmaps.full(size)
+    for mask in masks:
+        combined &= mask
+    return combined
+
+
+def match_positions(
+    dataset: Dataset,
+    *args: Any,
+    lookups: Dict[Hashable, int] | None = None,
+    **filters: Any,
+) -> List[int]:
+    """Return row positions matching the ``filter_masks`` filters, in dataset order."""
+    masks = filter_masks(dataset, *args, lookups=lookups, **filters)
+    return list(bitmaps.iter_positions(_intersect(masks.values(), len(dataset))))
+
+
+def facet_counts(
+    dataset: Dataset,
+    fields: Sequence[str],
+    **filters: Any,
+) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    """Count matches per value of each facet field under the filters on the other fields.
+
+    A field's own filter is left out of its counts so every option shows how many rows it
+    would match if selected. Returns ``(total, facets)`` where ``total`` honours all filters.
+    """
+    masks = filter_masks(dataset, **filters)
+    size = len(dataset)
+    facets: Dict[str, Dict[str, int]] = {}
+    for field in fields:
+        mask = _intersect((bitmap for name, bitmap in masks.items() if name != field), size)
+        counts = {
+            value: bitmaps.count(mask & bitmap)
+            for value, bitmap in dataset.value_bitmaps[field].items()
+        }
+        facets[field] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+    return bitmaps.count(_intersect(masks.values(), size)), facets
 
 
 def filter_objects(  # pylint: disable=too-many-arguments,too-many-positional-arguments
@@ -18,31 +180,94 @@ def filter_objects(  # pylint: disable=too-many-arguments,too-many-positional-ar
     constellation: str | None = None,
     spectral_type: str | None = None,
     search: str | None = None,
+    spectral_class: str | None = None,
+    luminosity: str | None = None,
+    *,
+    dataset: Dataset | None = None,
 ) -> List[AstronomicalObject]:
     """Filter the dataset by magnitude, distance, spectral type, etc."""
-    objects = load_objects()
-    constellation_lower = constellation.lower() if constellation else None
-    spectral_lower = spectral_type.lower() if spectral_type else None
-    search_lower = search.lower() if search else None
-
-    def passes_filters(obj: AstronomicalObject) -> bool:  # pylint: disable=too-many-return-statements
-        if magnitude_min is not None and obj.magnitude < magnitude_min:
-            return False
-        if magnitude_max is not None and obj.magnitude > magnitude_max:
-            return False
-        if distance_min is not None and obj.distance_ly < distance_min:
-            return False
-        if distance_max is not None and obj.distance_ly > distance_max:
-            return False
-        if constellation_lower and obj.constellation.lower() != constellation_lower:
-            return False
-        if spectral_lower and obj.spectral_type.lower() != spectral_lower:
-            return False
-        if search_lower and search_lower not in f"{obj.name.lower()} {obj.constellation.lower()}":
-            return False
-        return True
-
-    return [obj for obj in objects if passes_filters(obj)]
+    dataset = _resolve(dataset)
+    positions = match_positions(
+        dataset, magnitude_min, magnitude_max, distance_min, distance_max,
+        constellation, spectral_type, search, spectral_class, luminosity,
+    )
+    return [dataset.objects[pos] for pos in positions]
+
+
+def nearest_objects(  # pylint: disable=too-many-arguments
+    dataset: Dataset,
+    magnitude: float,
+    distance_ly: float,
+    *,
+    k: int = 10,
+    radius: float | None = None,
+    exclude_id: int | None = None,
+    **filters: Any,
+) -> List[Neighbor]:
+    """Return objects closest to a (magnitude, distance) point through the KD-tree.
+
+    With ``radius`` every match inside it is returned and ``k`` is ignored. Filters restrict
+    the candidates through their bitmap mask.
+    """
+    size = len(dataset)
+    masks = filter_masks(dataset, **filters)
+    mask = _intersect(masks.values(), size) if masks else None
+    excluded = dataset.id_positions.get(exclude_id) if exclude_id is not None else None
+    if excluded is not None:
+        mask = (bitmaps.full(size) if mask is None else mask) & ~(1 << excluded)
+    allowed = bitmaps.membership(mask, size) if mask is not None else None
+
+    index = dataset.neighbor_index
+    hits = (
+        index.within(magnitude, distance_ly, radius, allowed) if radius is not None
+        else index.nearest(magnitude, distance_ly, k, allowed)
+    )
+    return [
+        Neighbor(object=dataset.objects[pos], separation=round(separation, 6))
+        for separation, pos in hits
+    ]
+
+
+def evaluate_batch(
+    queries: Sequence[BatchQuerySpec], dataset: Dataset | None = None,
+) -> List[BatchQueryResult]:
+    """Evaluate many filter specs against one dataset snapshot, sharing index lookups."""
+    dataset = _resolve(dataset)
+    lookups: Dict[Hashable, int] = {}
+    results: List[BatchQueryResult] = []
+    for query in queries:
+        positions = match_positions(
+            dataset, lookups=lookups, **query.model_dump(include=set(FILTER_FIELDS)),
+        )
+        matched = [dataset.objects[pos] for pos in positions]
+        if query.kind == "stats":
+            results.append(BatchQueryResult(kind="stats", stats=compute_stats(matched)))
+            continue
+        items, total, pages = paginate_objects(matched, query.page, query.page_size)
+        results.append(BatchQueryResult(
+            kind="objects",
+            objects=PaginatedObjectsResponse(
+                items=items, total=total, page=query.page, page_size=query.page_size, pages=pages,
+            ),
+        ))
+    return results
+
+
+def iter_filtered_positions(
+    dataset: Dataset,
+    chunk_size: int = 500,
+    **filters: Any,
+) -> Iterator[List[int]]:
+    """Yield matching row positions in chunks; memory is one bit per row plus one chunk."""
+    mask = _intersect(filter_masks(dataset, **filters).values(), len(dataset))
+    chunk: List[int] = []
+    for pos in bitmaps.iter_positions(mask):
+        chunk.append(pos)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 def paginate_objects(
@@ -93,9 +318,11 @@ def compute_stats(
     )
 
 
-def get_magnitude_distribution(bins: int = 10) -> Dict[str, List[float | int]]:
+def get_magnitude_distribution(
+    bins: int = 10, dataset: Dataset | None = None,
+) -> Dict[str, List[float | int]]:
     """Calculate magnitude distribution histogram."""
-    dataset = load_objects()
+    dataset = _resolve(dataset).objects
     if not dataset:
         return {"bins": [], "counts": []}
 
@@ -118,16 +345,18 @@ def get_magnitude_distribution(bins: int = 10) -> Dict[str, List[float | int]]:
     return {"bins": bin_labels, "counts": counts}
 
 
-def get_spectral_type_breakdown() -> Dict[str, int]:
+def get_spectral_type_breakdown(dataset: Dataset | None = None) -> Dict[str, int]:
     """Count objects by spectral type."""
-    dataset = load_objects()
+    dataset = _resolve(dataset).objects
     spectral_counts = Counter(obj.spectral_type for obj in dataset if obj.spectral_type)
     return dict(spectral_counts.most_common())
 
 
-def get_distance_distribution(bins: int = 10) -> Dict[str, List[float | int]]:
+def get_distance_distribution(
+    bins: int = 10, dataset: Dataset | None = None,
+) -> Dict[str, List[float | int]]:
     """Calculate distance distribution histogram."""
-    dataset = load_objects()
+    dataset = _resolve(dataset).objects
     if not dataset:
         return {"bins": [], "counts": []}
 
@@ -150,10 +379,122 @@ def get_distance_distribution(bins: int = 10) -> Dict[str, List[float | int]]:
     return {"bins": bin_labels, "counts": counts}
 
 
-def get_magnitude_distance_correlation() -> Dict[str, List[float]]:
+def get_magnitude_distance_correlation(
+    dataset: Dataset | None = None,
+) -> Dict[str, List[float]]:
     """Get magnitude-distance data points for scatter plot."""
-    dataset = load_objects()
+    dataset = _resolve(dataset).objects
     return {
         "magnitudes": [obj.magnitude for obj in dataset],
         "distances": [obj.distance_ly for obj in dataset],
     }
+
+
+def column_sketch(dataset: Dataset, column: str, **filters: Any) -> KLLSketch:
+    """Return the quantile sketch of ``column`` for the rows matching ``filters``.
+
+    Unfiltered sketches are built with the dataset snapshot; filtered ones are built on
+    first use and kept in a small LRU keyed by snapshot generation and filter values.
+    """
+    active = tuple(sorted(
+        (name, value) for name, value in filters.items() if value not in (None, "")
+    ))
+    if not active:
+        return dataset.sketches[column]
+
+    key = (dataset.generation, column, active)
+    with _FILTER_SKETCHES_LOCK:
+        sketch = _FILTER_SKETCHES.get(key)
+        if sketch is not None:
+            _FILTER_SKETCHES.move_to_end(key)
+            return sketch
+
+    values = dataset.column(column)
+    sketch = KLLSketch.from_values(values[pos] for pos in match_positions(dataset, **filters))
+    with _FILTER_SKETCHES_LOCK:
+        _FILTER_SKETCHES[key] = sketch
+        while len(_FILTER_SKETCHES) > FILTER_SKETCH_CACHE_SIZE:
+            _FILTER_SKETCHES.popitem(last=False)
+    return sketch
+
+
+def cached_filter_sketches() -> List[KLLSketch]:
+    """Return the cached per-filter sketches (for memory introspection)."""
+    with _FILTER_SKETCHES_LOCK:
+        return list(_FILTER_SKETCHES.values())
+
+
+def get_quantiles(
+    column: str,
+    quantiles: Sequence[float],
+    bins: int | None = None,
+    *,
+    dataset: Dataset | None = None,
+    **filters: Any,
+) -> Dict[str, Any]:
+    """Estimate quantiles of a numeric column and, optionally, equal-count bin edges.
+
+    Quantile bins adapt to skewed data (e.g. distances) where equal-width histograms
+    crowd almost everything into the first bin. Counts per bin are sketch estimates.
+    """
+    if column not in SKETCHED_COLUMNS:
+        raise ValueError(f"No quantile sketch for column {column!r}")
+    sketch = column_sketch(_resolve(dataset), column, **filters)
+    result: Dict[str, Any] = {
+        "column": column,
+        "count": len(sketch),
+        "quantiles": {
+            str(q): None if value is None else round(value, 4)
+            for q, value in zip(quantiles, sketch.quantiles(quantiles))
+        },
+    }
+    if bins:
+        if not sketch.count:
+            result.update(edges=[], counts=[])
+            return result
+        edges = sketch.quantiles([i / bins for i in range(bins + 1)])
+        ranks = [0] + [sketch.rank(edge) for edge in edges[1:]]
+        result.update(
+            edges=[round(edge, 4) for edge in edges],
+            counts=[ranks[i + 1] - ranks[i] for i in range(bins)],
+        )
+    return result
+
+
+def get_group_aggregates(  # pylint: disable=too-many-locals
+    by: str,
+    column: str,
+    aggregates: Sequence[str] = ("count",),
+    *,
+    dataset: Dataset | None = None,
+    **filters: Any,
+) -> Dict[str, Any]:
+    """Reduce ``column`` per value of the categorical column ``by`` under the filters.
+
+    Groups come from the per-value bitmaps, so each group's membership and count are one
+    ``&`` and a popcount over the filter mask; min/max/mean only read the group's rows from
+    the packed column. Rows with no value for ``by`` (unparsed spectral classes) are skipped.
+    """
+    if by not in FACET_COLUMNS:
+        raise ValueError(f"Cannot group by column {by!r}")
+    if column not in NUMERIC_COLUMNS:
+        raise ValueError(f"Cannot aggregate non-numeric column {column!r}")
+    dataset = _resolve(dataset)
+    mask = _intersect(filter_masks(dataset, **filters).values(), len(dataset))
+    values = dataset.column(column)
+    reductions = {"min": min, "max": max, "mean": lambda group: fsum(group) / len(group)}
+    wanted = [(name, reductions[name]) for name in aggregates if name in reductions]
+    groups: List[Dict[str, Any]] = []
+    for key, bitmap in dataset.value_bitmaps[by].items():
+        group_mask = mask & bitmap
+        count = bitmaps.count(group_mask)
+        if not count:
+            continue
+        entry: Dict[str, Any] = {"key": key, "count": count}
+        if wanted:
+            group = [values[pos] for pos in bitmaps.iter_positions(group_mask)]
+            for name, reduce_group in wanted:
+                entry[name] = round(reduce_group(group), 4)
+        groups.append(entry)
+    groups.sort(key=lambda entry: (-entry["count"], entry["key"]))
+    return {"by": by, "column": column, "total": bitmaps.count(mask), "groups": groups}
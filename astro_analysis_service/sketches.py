@@ -0,0 +1,127 @@
+"""Mergeable KLL quantile sketch for percentile and quantile-binning queries."""
+from __future__ import annotations
+
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterable, List, Sequence, Tuple
+
+DEFAULT_K = 200
+_CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """KLL sketch (Karnin, Lang, Liberty 2016) over floats.
+
+    Items live in a stack of compactors; an item at level ``h`` stands for ``2**h`` inputs.
+    When the sketch is full, one level is sorted and every other item promoted, so memory
+    stays ``O(k)`` while rank error is roughly ``1/k``. Sketches built over disjoint inputs
+    can be merged without revisiting the data. Below ``k`` items the sketch is exact.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: int | None = 0) -> None:
+        self.k = k
+        self.count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+        self._compactors: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+        self._sorted: Tuple[List[float], List[int]] | None = None
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], k: int = DEFAULT_K) -> KLLSketch:
+        """Build a sketch over ``values``."""
+        sketch = cls(k)
+        for value in values:
+            sketch.update(value)
+        return sketch
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return max(2, int(self.k * _CAPACITY_DECAY ** depth) + 1)
+
+    def _retained(self) -> int:
+        return sum(len(compactor) for compactor in self._compactors)
+
+    def _max_retained(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self._compactors)))
+
+    def update(self, value: float) -> None:
+        """Add one value."""
+        self._compactors[0].append(value)
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._sorted = None
+        if self._retained() >= self._max_retained():
+            self._compress()
+
+    def merge(self, other: KLLSketch) -> None:
+        """Fold ``other`` into this sketch in place."""
+        while len(self._compactors) < len(other._compactors):
+            self._compactors.append([])
+        for level, compactor in enumerate(other._compactors):
+            self._compactors[level].extend(compactor)
+        self.count += other.count
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+        self._sorted = None
+        while self._retained() >= self._max_retained():
+            self._compress()
+
+    def _compress(self) -> None:
+        for level, compactor in enumerate(self._compactors):
+            if len(compactor) >= self._capacity(level):
+                if level + 1 == len(self._compactors):
+                    self._compactors.append([])
+                compactor.sort()
+                # With an odd count the largest item stays behind so no weight is lost.
+                leftover = [compactor.pop()] if len(compactor) % 2 else []
+                offset = self._random.randint(0, 1)
+                self._compactors[level + 1].extend(compactor[offset::2])
+                self._compactors[level] = leftover
+                return
+
+    def _weighted(self) -> Tuple[List[float], List[int]]:
+        """Return retained items in ascending order with their cumulative weights."""
+        if self._sorted is None:
+            items = sorted(
+                (value, 1 << level)
+                for level, compactor in enumerate(self._compactors)
+                for value in compactor
+            )
+            self._sorted = (
+                [value for value, _ in items],
+                list(accumulate(weight for _, weight in items)),
+            )
+        return self._sorted
+
+    def rank(self, value: float) -> int:
+        """Estimate how many inserted values are ``<= value``."""
+        values, cumulative = self._weighted()
+        index = bisect_right(values, value)
+        return cumulative[index - 1] if index else 0
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the value at quantile ``q`` in ``[0, 1]``; ``None`` when empty.
+
+        The extremes are tracked exactly, so ``q=0`` and ``q=1`` return the true min/max.
+        """
+        values, cumulative = self._weighted()
+        if not values:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        index = bisect_left(cumulative, q * cumulative[-1])
+        return values[min(index, len(values) - 1)]
+
+    def quantiles(self, qs: Sequence[float]) -> List[float | None]:
+        """Estimate several quantiles at once."""
+        return [self.quantile(q) for q in qs]
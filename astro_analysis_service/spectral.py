@@ -0,0 +1,59 @@
+"""Parsing of free-text MK spectral types into structured, encodable fields."""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+TEMPERATURE_CLASSES = "OBAFGKMLTY"
+LUMINOSITY_CLASSES = ("I", "II", "III", "IV", "V", "VI", "VII")
+UNKNOWN_CODE = -1
+
+_SPECTRAL_RE = re.compile(
+    r"^\s*(?P<prefix>sd|d|g)?"
+    r"(?P<cls>[OBAFGKMLTY])\s*"
+    r"(?P<sub>\d+(?:\.\d+)?)?\s*"
+    r"(?P<lum>Ia0|Ia\+|Iab|Ia|Ib|III|II|IV|I|VII|VI|V)?",
+)
+# Supergiant sub-classes collapse to family "I"; Mount Wilson prefixes imply a class.
+_LUMINOSITY_FAMILY = {"Ia0": "I", "Ia+": "I", "Iab": "I", "Ia": "I", "Ib": "I"}
+_PREFIX_LUMINOSITY = {"sd": "VI", "d": "V", "g": "III"}
+
+
+class SpectralClass(NamedTuple):
+    """Structured MK classification, e.g. ``K1.5III`` -> ``("K", 1.5, "III")``."""
+
+    temperature_class: str
+    subclass: float | None
+    luminosity_class: str | None
+
+
+@lru_cache(maxsize=4096)
+def parse_spectral_type(text: str | None) -> SpectralClass | None:
+    """Parse a spectral type string; returns ``None`` when no temperature class is found.
+
+    Only the primary component is kept: ``F5IV-V`` is ``("F", 5.0, "IV")`` and
+    ``K3V+M0V`` is ``("K", 3.0, "V")``.
+    """
+    if not text:
+        return None
+    match = _SPECTRAL_RE.match(text)
+    if match is None:
+        return None
+    subclass = float(match["sub"]) if match["sub"] else None
+    luminosity = match["lum"]
+    if luminosity is not None:
+        luminosity = _LUMINOSITY_FAMILY.get(luminosity, luminosity)
+    elif match["prefix"]:
+        luminosity = _PREFIX_LUMINOSITY[match["prefix"]]
+    return SpectralClass(match["cls"], subclass, luminosity)
+
+
+def encode_temperature_class(value: str | None) -> int:
+    """Return the compact code for a temperature class letter."""
+    return TEMPERATURE_CLASSES.find(value) if value else UNKNOWN_CODE
+
+
+def encode_luminosity_class(value: str | None) -> int:
+    """Return the compact code for a luminosity class numeral."""
+    return LUMINOSITY_CLASSES.index(value) if value in LUMINOSITY_CLASSES else UNKNOWN_CODE
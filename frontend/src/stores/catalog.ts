@@ -1,6 +1,14 @@
 import { defineStore } from "pinia";
 import axios from "axios";
-import type { AstronomicalObject, FiltersPayload, PaginatedObjectsResponse, StatsResponse } from "../types";
+import type {
+  AstronomicalObject,
+  DatasetEvent,
+  FacetCountsResponse,
+  FiltersPayload,
+  PaginatedObjectsResponse,
+  RefreshEvent,
+  StatsResponse
+} from "../types";
 
 interface CatalogState {
   filters: FiltersPayload;
@@ -14,7 +22,10 @@ interface CatalogState {
   spectralBreakdown: Record<string, number> | null;
   distanceDistribution: { bins: number[]; counts: number[] } | null;
   correlation: { magnitudes: number[]; distances: number[] } | null;
+  facets: Record<string, Record<string, number>>;
   maxRecords: number;
+  generation: number | null;
+  refreshStage: RefreshEvent["stage"] | null;
 }
 
 const defaultFilters: FiltersPayload = {
@@ -31,6 +42,8 @@ const defaultFilters: FiltersPayload = {
 
 const STORAGE_KEY = 'astro-settings';
 
+let eventSource: EventSource | null = null;
+
 function loadMaxRecords(): number {
   try {
     const stored = localStorage.getItem(STORAGE_KEY);
@@ -65,7 +78,10 @@ export const useCatalogStore = defineStore("catalog", {
     spectralBreakdown: null,
     distanceDistribution: null,
     correlation: null,
-    maxRecords: loadMaxRecords()
+    facets: {},
+    maxRecords: loadMaxRecords(),
+    generation: null,
+    refreshStage: null
   }),
   actions: {
     setFilters(partial: Partial<FiltersPayload>) {
@@ -75,10 +91,14 @@ export const useCatalogStore = defineStore("catalog", {
       this.loading = true;
       this.error = null;
       try {
-        const [statsResponse, objectsResponse] = await Promise.all([
-          axios.get<StatsResponse>("/stats"),
-          axios.get<PaginatedObjectsResponse>("/objects", { params: this.filters })
+        const { page, page_size, ...facetFilters } = this.filters;
+        const limit = this.maxRecords;
+        const [statsResponse, objectsResponse, facetsResponse] = await Promise.all([
+          axios.get<StatsResponse>("/stats", { params: { limit } }),
+          axios.get<PaginatedObjectsResponse>("/objects", { params: { ...this.filters, limit } }),
+          axios.get<FacetCountsResponse>("/objects/facets", { params: { ...facetFilters, limit } })
         ]);
+        this.facets = facetsResponse.data.facets;
         this.stats = statsResponse.data;
         this.objects = objectsResponse.data.items;
         this.total = objectsResponse.data.total;
@@ -94,40 +114,77 @@ export const useCatalogStore = defineStore("catalog", {
     async fetchMagnitudeDistribution(bins = 10) {
       const response = await axios.get<{ bins: number[]; counts: number[] }>(
         "/analysis/magnitude-distribution",
-        { params: { bins } }
+        { params: { bins, limit: this.maxRecords } }
       );
       this.magnitudeDistribution = response.data;
     },
     async fetchSpectralBreakdown() {
-      const response = await axios.get<Record<string, number>>("/analysis/spectral-breakdown");
+      const response = await axios.get<Record<string, number>>("/analysis/spectral-breakdown", {
+        params: { limit: this.maxRecords }
+      });
       this.spectralBreakdown = response.data;
     },
     async fetchDistanceDistribution(bins = 10) {
       const response = await axios.get<{ bins: number[]; counts: number[] }>(
         "/analysis/distance-distribution",
-        { params: { bins } }
+        { params: { bins, limit: this.maxRecords } }
       );
       this.distanceDistribution = response.data;
     },
     async fetchCorrelation() {
       const response = await axios.get<{ magnitudes: number[]; distances: number[] }>(
-        "/analysis/magnitude-distance-correlation"
+        "/analysis/magnitude-distance-correlation",
+        { params: { limit: this.maxRecords } }
       );
       this.correlation = response.data;
     },
+    connectEvents() {
+      // Re-query only when the server announces a new snapshot for our limit
+      eventSource?.close();
+      this.generation = null;
+      eventSource = new EventSource(`/events?limit=${this.maxRecords}`);
+      eventSource.addEventListener("dataset", (event) => {
+        const data: DatasetEvent = JSON.parse((event as MessageEvent).data);
+        if (data.limit !== this.maxRecords || data.generation === this.generation) {
+          return;
+        }
+        const changed = this.generation !== null;
+        this.generation = data.generation;
+        if (changed) {
+          this.reload();
+        }
+      });
+      eventSource.addEventListener("refresh", (event) => {
+        const data: RefreshEvent = JSON.parse((event as MessageEvent).data);
+        this.refreshStage = data.stage === "started" ? data.stage : null;
+        if (data.stage === "failed") {
+          this.error = data.error ?? "Data refresh failed";
+        }
+      });
+    },
+    disconnectEvents() {
+      eventSource?.close();
+      eventSource = null;
+    },
+    async reload() {
+      const analysis: Promise<void>[] = [];
+      if (this.magnitudeDistribution) analysis.push(this.fetchMagnitudeDistribution());
+      if (this.spectralBreakdown) analysis.push(this.fetchSpectralBreakdown());
+      if (this.distanceDistribution) analysis.push(this.fetchDistanceDistribution());
+      if (this.correlation) analysis.push(this.fetchCorrelation());
+      await Promise.all([this.refresh(), ...analysis]);
+    },
     resetFilters() {
       this.filters = { ...defaultFilters };
       this.refresh();
     },
     async updateMaxRecords(limit: number) {
       try {
-        // Trigger backend to refresh data with new limit
-        await axios.post('/admin/refresh-data', { limit });
-        
-        // Save to localStorage
+        // Every request carries the limit, so the server picks the matching snapshot
         this.maxRecords = limit;
         saveMaxRecords(limit);
-        
+        this.connectEvents();
+
         // Refresh the UI data
         await this.refresh();
       } catch (error) {
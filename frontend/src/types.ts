@@ -5,6 +5,7 @@ export interface AstronomicalObject {
   magnitude: number;
   distance_ly: number;
   spectral_type: string;
+  planet_count: number;
 }
 
 export interface PaginatedObjectsResponse {
@@ -24,6 +25,11 @@ export interface StatsResponse {
   dimmest_object: AstronomicalObject | null;
 }
 
+export interface FacetCountsResponse {
+  total: number;
+  facets: Record<string, Record<string, number>>;
+}
+
 export interface FiltersPayload {
   magnitude_min?: number;
   magnitude_max?: number;
@@ -32,6 +38,21 @@ export interface FiltersPayload {
   constellation?: string;
   spectral_type?: string;
   search?: string;
+  spectral_class?: string;
+  luminosity?: string;
   page: number;
   page_size: number;
 }
+
+export interface DatasetEvent {
+  limit: number;
+  generation: number;
+  count: number;
+  default_limit: number;
+}
+
+export interface RefreshEvent {
+  stage: "started" | "completed" | "failed";
+  limit: number;
+  error?: string;
+}
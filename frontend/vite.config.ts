@@ -15,7 +15,9 @@ export default defineConfig({
       "/health": apiProxyTarget,
       "/ready": apiProxyTarget,
       "/analysis": apiProxyTarget,
-      "/admin": apiProxyTarget
+      "/admin": apiProxyTarget,
+      "/query": apiProxyTarget,
+      "/events": apiProxyTarget
     }
   },
   build: {
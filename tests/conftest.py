@@ -0,0 +1,63 @@
+"""Shared pytest fixtures."""
+from itertools import count
+
+import pytest
+
+from astro_analysis_service import data_loader
+from astro_analysis_service.models import AstronomicalObject
+
+
+@pytest.fixture(autouse=True)
+def mock_nasa_dataset(monkeypatch):
+    """Provide a deterministic mock dataset for API tests."""
+    mock_data = [
+        AstronomicalObject(
+            id=1, name="Sirius", constellation="Canis Major",
+            magnitude=-1.46, distance_ly=8.6, spectral_type="A1V",
+        ),
+        AstronomicalObject(
+            id=2, name="Canopus", constellation="Carina",
+            magnitude=-0.74, distance_ly=310, spectral_type="B8Ia",
+        ),
+        AstronomicalObject(
+            id=3, name="Arcturus", constellation="Bootes",
+            magnitude=-0.05, distance_ly=36.7, spectral_type="K1.5III",
+        ),
+        AstronomicalObject(
+            id=4, name="Vega", constellation="Lyra",
+            magnitude=0.03, distance_ly=25.0, spectral_type="A0V",
+        ),
+        AstronomicalObject(
+            id=5, name="Capella", constellation="Auriga",
+            magnitude=0.08, distance_ly=42.9, spectral_type="G5III",
+        ),
+        AstronomicalObject(
+            id=6, name="Rigel", constellation="Orion",
+            magnitude=0.12, distance_ly=860.0, spectral_type="B8Ia",
+        ),
+        AstronomicalObject(
+            id=7, name="Procyon", constellation="Canis Minor",
+            magnitude=0.38, distance_ly=11.5, spectral_type="F5IV-V",
+        ),
+        AstronomicalObject(
+            id=8, name="Achernar", constellation="Eridanus",
+            magnitude=0.46, distance_ly=139.0, spectral_type="B6Vep",
+        ),
+        AstronomicalObject(
+            id=9, name="Betelgeuse", constellation="Orion",
+            magnitude=0.42, distance_ly=642.0, spectral_type="M2Iab",
+        ),
+        AstronomicalObject(
+            id=10, name="Altair", constellation="Aquila",
+            magnitude=0.77, distance_ly=16.7, spectral_type="A7V",
+        ),
+    ]
+    # Every mock load counts as a new remote fetch, as a forced refresh would be.
+    fetches = count()
+    data_loader.clear_cache()
+    monkeypatch.setattr(
+        "astro_analysis_service.data_loader._load_from_nasa",
+        lambda **kwargs: (mock_data, f"mock-fetch-{next(fetches)}"),
+    )
+    yield
+    data_loader.clear_cache()
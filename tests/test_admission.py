@@ -0,0 +1,64 @@
+"""Tests for per-endpoint-class admission control."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from astro_analysis_service.admission import AdmissionGate, AdmissionRejected
+from astro_analysis_service.main import HEAVY_GATE, app
+
+client = TestClient(app)
+
+
+def test_gate_caps_concurrency_and_bounds_queue():
+    """Excess requests queue up to the bound, then get rejected; slots go FIFO."""
+
+    async def scenario():
+        gate = AdmissionGate("test", 1, 1, timeout=1.0, retry_after=1)
+        await gate.acquire()
+        waiting = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.queue_depth == 1
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await gate.acquire()
+        assert excinfo.value.reason == "queue_full"
+
+        gate.release()
+        await waiting
+        assert (gate.in_flight, gate.queue_depth) == (1, 0)
+        gate.release()
+        assert gate.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_gate_times_out_queued_requests():
+    """A queued request gives up after the timeout without leaking a slot."""
+
+    async def scenario():
+        gate = AdmissionGate("test", 1, 4, timeout=0.01, retry_after=1)
+        await gate.acquire()
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await gate.acquire()
+        assert excinfo.value.reason == "timeout"
+        gate.release()
+        assert (gate.in_flight, gate.queue_depth) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_saturated_class_rejects_fast_without_starving_others(monkeypatch):
+    """A saturated heavy class answers 503 with Retry-After; other classes still serve."""
+    monkeypatch.setattr(HEAVY_GATE, "concurrency", 0)
+    monkeypatch.setattr(HEAVY_GATE, "queue_size", 0)
+
+    rejected = client.get("/analysis/spectral-breakdown")
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == str(HEAVY_GATE.retry_after)
+
+    assert client.get("/objects").status_code == 200
+    assert client.get("/health").status_code == 200
+    metrics = client.get("/metrics").text
+    assert 'astro_admission_rejections_total{endpoint_class="heavy",reason="queue_full"}' in metrics
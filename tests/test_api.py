@@ -1,64 +1,13 @@
 """Tests for the FastAPI endpoints using a mock dataset."""
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
 from astro_analysis_service import data_loader
+from astro_analysis_service.data_loader import SNAPSHOTS
 from astro_analysis_service.main import app
-from astro_analysis_service.models import AstronomicalObject
-
-
-@pytest.fixture(autouse=True)
-def mock_nasa_dataset(monkeypatch):
-    """Provide a deterministic mock dataset for API tests."""
-    mock_data = [
-        AstronomicalObject(
-            id=1, name="Sirius", constellation="Canis Major",
-            magnitude=-1.46, distance_ly=8.6, spectral_type="A1V",
-        ),
-        AstronomicalObject(
-            id=2, name="Canopus", constellation="Carina",
-            magnitude=-0.74, distance_ly=310, spectral_type="B8Ia",
-        ),
-        AstronomicalObject(
-            id=3, name="Arcturus", constellation="Bootes",
-            magnitude=-0.05, distance_ly=36.7, spectral_type="K1.5III",
-        ),
-        AstronomicalObject(
-            id=4, name="Vega", constellation="Lyra",
-            magnitude=0.03, distance_ly=25.0, spectral_type="A0V",
-        ),
-        AstronomicalObject(
-            id=5, name="Capella", constellation="Auriga",
-            magnitude=0.08, distance_ly=42.9, spectral_type="G5III",
-        ),
-        AstronomicalObject(
-            id=6, name="Rigel", constellation="Orion",
-            magnitude=0.12, distance_ly=860.0, spectral_type="B8Ia",
-        ),
-        AstronomicalObject(
-            id=7, name="Procyon", constellation="Canis Minor",
-            magnitude=0.38, distance_ly=11.5, spectral_type="F5IV-V",
-        ),
-        AstronomicalObject(
-            id=8, name="Achernar", constellation="Eridanus",
-            magnitude=0.46, distance_ly=139.0, spectral_type="B6Vep",
-        ),
-        AstronomicalObject(
-            id=9, name="Betelgeuse", constellation="Orion",
-            magnitude=0.42, distance_ly=642.0, spectral_type="M2Iab",
-        ),
-        AstronomicalObject(
-            id=10, name="Altair", constellation="Aquila",
-            magnitude=0.77, distance_ly=16.7, spectral_type="A7V",
-        ),
-    ]
-    data_loader.load_objects.cache_clear()
-    monkeypatch.setattr(
-        "astro_analysis_service.data_loader._load_from_nasa",
-        lambda **kwargs: mock_data,
-    )
-    yield
-    data_loader.load_objects.cache_clear()
+from astro_analysis_service.nasa_client import NASA_CLIENT
 
 
 client = TestClient(app)
@@ -134,3 +83,203 @@ def test_metrics_endpoint_exposes_dataset_gauge():
     response = client.get("/metrics")
     assert response.status_code == 200
     assert "astro_dataset_objects_total" in response.text
+
+
+def test_export_streams_filtered_rows_as_ndjson_and_csv():
+    """Bulk export applies the /objects filters and streams every match."""
+    response = client.get("/objects/export", params={"constellation": "orion"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Rigel", "Betelgeuse"]
+
+    csv_response = client.get("/objects/export", params={"format": "csv"})
+    assert csv_response.status_code == 200
+    lines = csv_response.text.splitlines()
+    assert lines[0] == "id,name,constellation,magnitude,distance_ly,spectral_type,planet_count"
+    assert len(lines) == 11
+
+
+def test_export_streams_arrow_ipc():
+    """Arrow export produces a readable IPC stream with the full schema."""
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc  # pylint: disable=import-outside-toplevel
+
+    response = client.get(
+        "/objects/export", params={"format": "arrow", "magnitude_max": 0.1},
+    )
+    assert response.status_code == 200
+    table = pyarrow.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 5
+    assert table.column_names == [
+        "id", "name", "constellation", "magnitude", "distance_ly", "spectral_type",
+        "planet_count",
+    ]
+
+
+def test_batch_query_returns_results_in_order():
+    """Batch queries evaluate each filter set with its own pagination or aggregate."""
+    response = client.post(
+        "/query/batch",
+        json={
+            "queries": [
+                {"magnitude_max": 0.1, "page_size": 2},
+                {"kind": "stats", "magnitude_min": 0.1, "distance_max": 100},
+                {"constellation": "Orion", "magnitude_max": 0.2},
+                {"magnitude_max": 0.1, "page": 3, "page_size": 2},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["kind"] for result in results] == ["objects", "stats", "objects", "objects"]
+
+    first = results[0]["objects"]
+    assert first["total"] == 5
+    assert [obj["name"] for obj in first["items"]] == ["Sirius", "Canopus"]
+    assert results[1]["stats"]["count"] == 2  # Procyon and Altair
+    assert [obj["name"] for obj in results[2]["objects"]["items"]] == ["Rigel"]
+    assert [obj["name"] for obj in results[3]["objects"]["items"]] == ["Capella"]
+
+
+def test_facets_count_values_under_other_filters():
+    """Facet counts ignore the field's own filter but honour all the others."""
+    response = client.get(
+        "/objects/facets",
+        params={"constellation": "orion", "magnitude_max": 0.3},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total"] == 1  # Rigel
+    constellations = payload["facets"]["constellation"]
+    assert constellations["Orion"] == 1
+    assert constellations["Canis Major"] == 1
+    assert constellations["Aquila"] == 0
+    assert payload["facets"]["spectral_type"] == {
+        "B8Ia": 1, "A0V": 0, "A1V": 0, "A7V": 0, "B6Vep": 0, "F5IV-V": 0,
+        "G5III": 0, "K1.5III": 0, "M2Iab": 0,
+    }
+
+
+def test_nearest_and_neighbors_use_magnitude_distance_space():
+    """Similarity lookups rank by magnitude/log-distance and honour filters."""
+    nearest = client.get("/objects/nearest", params={"magnitude": 0.1, "distance_ly": 850, "k": 2})
+    assert nearest.status_code == 200
+    names = [item["object"]["name"] for item in nearest.json()["items"]]
+    assert names == ["Rigel", "Betelgeuse"]
+    for point in ({"magnitude": "nan", "distance_ly": 50}, {"magnitude": 1, "distance_ly": "inf"}):
+        assert client.get("/objects/nearest", params=point).status_code == 422
+
+    neighbors = client.get("/objects/6/neighbors", params={"k": 3, "constellation": "orion"})
+    assert neighbors.status_code == 200
+    items = neighbors.json()["items"]
+    assert [item["object"]["name"] for item in items] == ["Betelgeuse"]
+    assert items[0]["separation"] > 0
+
+    within = client.get("/objects/1/neighbors", params={"radius": 100})
+    assert len(within.json()["items"]) == 9
+
+    assert client.get("/objects/999/neighbors").status_code == 404
+
+
+def test_structured_spectral_filters():
+    """Spectral class, luminosity and prefix filters resolve through the parsed index."""
+    def names(**params):
+        response = client.get("/objects", params={"page_size": 100, **params})
+        assert response.status_code == 200
+        return {obj["name"] for obj in response.json()["items"]}
+
+    assert names(spectral_class="B") == {"Canopus", "Rigel", "Achernar"}
+    assert names(spectral_class="a", luminosity="V") == {"Sirius", "Vega", "Altair"}
+    assert names(luminosity="III") == {"Arcturus", "Capella"}
+    assert names(luminosity="I") == {"Canopus", "Rigel", "Betelgeuse"}
+    assert names(spectral_type="K*") == {"Arcturus"}
+    assert names(spectral_type="A0*") == {"Vega"}
+    assert names(spectral_type="B8I*") == {"Canopus", "Rigel"}
+    assert names(spectral_type="F5IV-V") == {"Procyon"}
+
+
+def test_quantiles_endpoint_reports_percentiles_and_bins():
+    """Quantile summaries and equal-count bins come from the column sketches."""
+    response = client.get(
+        "/analysis/quantiles",
+        params={"column": "distance_ly", "q": [0, 0.5, 1], "bins": 5},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["count"] == 10
+    assert payload["quantiles"] == {"0.0": 8.6, "0.5": 36.7, "1.0": 860.0}
+    assert payload["edges"][0] == 8.6 and payload["edges"][-1] == 860.0
+    assert payload["counts"] == [2, 2, 2, 2, 2]
+
+    filtered = client.get(
+        "/analysis/quantiles", params={"column": "magnitude", "q": 0.5, "constellation": "orion"},
+    )
+    assert filtered.json()["count"] == 2
+    assert filtered.json()["quantiles"] == {"0.5": 0.12}
+
+    assert client.get("/analysis/quantiles", params={"q": 1.5}).status_code == 400
+
+
+def test_refresh_data_switches_default_snapshot(monkeypatch):
+    """Refreshing selects a snapshot by limit without mutating the shared NASA client."""
+    monkeypatch.setattr(SNAPSHOTS, "default_limit", SNAPSHOTS.default_limit)
+    max_records = NASA_CLIENT.max_records
+
+    response = client.post("/admin/refresh-data", json={"limit": 10})
+    assert response.status_code == 200
+    assert response.json()["count"] == 10
+    assert SNAPSHOTS.default_limit == 10
+    assert NASA_CLIENT.max_records == max_records
+
+    assert client.get("/objects", params={"limit": 10}).json()["total"] == 10
+    assert client.get("/stats", params={"limit": 5}).status_code == 422
+
+
+def test_groupby_reduces_numeric_column_per_category():
+    """Grouped aggregates respect filters and sort groups by size."""
+    response = client.get(
+        "/analysis/groupby",
+        params={"by": "constellation", "column": "magnitude", "agg": ["min", "max", "mean"]},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total"] == 10
+    assert payload["groups"][0] == {
+        "key": "Orion", "count": 2, "min": 0.12, "max": 0.42, "mean": 0.27,
+    }
+
+    filtered = client.get(
+        "/analysis/groupby", params={"by": "spectral_class", "magnitude_max": 0.1},
+    ).json()
+    assert {group["key"]: group["count"] for group in filtered["groups"]} == {
+        "A": 2, "B": 1, "K": 1, "G": 1,
+    }
+
+
+def test_object_planets_lists_child_rows(monkeypatch):
+    """Hosts expose the planet rows folded into them; unknown ids are 404."""
+    base = {"sy_snum": "1", "sy_vmag": "5.98", "sy_dist": "41.2", "hostname": "HR 8799"}
+    records = [
+        {**base, "pl_name": "HR 8799 e", "st_spectype": "A5 V"},
+        {**base, "pl_name": "HR 8799 c", "st_spectype": None},
+        {**base, "pl_name": "HR 8799 e", "st_spectype": "A5 V"},
+    ]
+    monkeypatch.setattr(
+        data_loader, "_load_from_nasa",
+        lambda **kwargs: (data_loader._group_by_host(records), "ps-fetch"),
+    )
+
+    response = client.get("/objects/1/planets")
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": 1,
+        "name": "HR 8799",
+        "planet_count": 2,
+        "rows": [
+            {"record_id": 1, "name": "HR 8799 e", "spectral_type": "A5 V"},
+            {"record_id": 2, "name": "HR 8799 c", "spectral_type": None},
+            {"record_id": 3, "name": "HR 8799 e", "spectral_type": "A5 V"},
+        ],
+    }
+    assert client.get("/objects/999/planets").status_code == 404
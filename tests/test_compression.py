@@ -0,0 +1,77 @@
+"""Tests for response compression and precompressed static assets."""
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from astro_analysis_service.compression import (
+    PrecompressedStaticFiles,
+    choose_encoding,
+    precompress_directory,
+)
+from astro_analysis_service.main import ANALYSIS_CACHE, app
+
+client = TestClient(app)
+
+
+def test_choose_encoding_respects_q_values():
+    """Clients can opt out of an encoding or prefer one by q-value."""
+    assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0, gzip", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+
+
+def test_large_responses_are_gzip_compressed():
+    """Responses above the size threshold are compressed; small ones are not."""
+    response = client.get(
+        "/objects", params={"page_size": 100}, headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["total"] == 10
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_analysis_responses_are_served_precompressed(monkeypatch):
+    """Analysis payloads are cached per dataset generation with ready-made variants."""
+    monkeypatch.setattr(ANALYSIS_CACHE, "minimum_size", 0)
+    params = {"bins": 50}
+    first = client.get(
+        "/analysis/magnitude-distribution", params=params, headers={"Accept-Encoding": "gzip"},
+    )
+    second = client.get(
+        "/analysis/magnitude-distribution", params=params, headers={"Accept-Encoding": "gzip"},
+    )
+    plain = client.get(
+        "/analysis/magnitude-distribution", params=params, headers={"Accept-Encoding": "identity"},
+    )
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.content == second.content
+    assert "content-encoding" not in plain.headers
+    assert first.json() == plain.json()
+    assert sum(plain.json()["counts"]) == 10
+
+
+def test_static_files_serve_precompressed_sidecars(tmp_path: Path):
+    """Sidecar .gz files are written once and served when the client accepts gzip."""
+    asset = tmp_path / "bundle.js"
+    asset.write_text("console.log('astro');\n" * 200, encoding="utf-8")
+    assert precompress_directory(tmp_path, minimum_size=100) >= 1
+    assert precompress_directory(tmp_path, minimum_size=100) == 0
+    assert (tmp_path / "bundle.js.gz").exists()
+
+    static_app = FastAPI()
+    static_app.mount("/app", PrecompressedStaticFiles(directory=str(tmp_path)), name="spa")
+    response = TestClient(static_app).get("/app/bundle.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.text == asset.read_text(encoding="utf-8")
+    assert gzip.decompress((tmp_path / "bundle.js.gz").read_bytes()) == asset.read_bytes()
@@ -0,0 +1,60 @@
+"""Tests for the Server-Sent Events stream of dataset changes."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from astro_analysis_service.data_loader import SNAPSHOTS, load_dataset
+from astro_analysis_service.events import EventBroker
+from astro_analysis_service.main import app, events
+
+client = TestClient(app)
+
+
+def _parse(frame: str) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_broker_delivers_events_published_from_other_threads():
+    """Frames published from worker threads reach the stream; idle streams keep alive."""
+
+    async def scenario():
+        broker = EventBroker()
+        stream = broker.stream(keepalive=0.01)
+        assert (await anext(stream)).startswith("retry:")
+        assert await anext(stream) == ": keepalive\n\n"
+        await asyncio.to_thread(broker.publish, "refresh", {"stage": "started"})
+        assert _parse(await anext(stream)) == ("refresh", {"stage": "started"})
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_events_announce_snapshot_and_refresh_progress(monkeypatch):
+    """Connecting announces the resident snapshot; refreshes push progress and changes."""
+    monkeypatch.setattr(SNAPSHOTS, "default_limit", SNAPSHOTS.default_limit)
+    dataset = load_dataset()
+
+    async def scenario():
+        response = await events(None)
+        assert response.media_type == "text/event-stream"
+        frames = response.body_iterator
+        await anext(frames)
+        kind, data = _parse(await anext(frames))
+        assert kind == "dataset" and data["generation"] == dataset.generation
+
+        await asyncio.to_thread(
+            client.post, "/admin/refresh-data", json={"limit": 10, "force": True},
+        )
+        received = [_parse(await anext(frames)) for _ in range(3)]
+        await frames.aclose()
+        return received
+
+    started, built, completed = asyncio.run(scenario())
+    assert started == ("refresh", {"stage": "started", "limit": 10, "force": True})
+    assert built[0] == "dataset" and built[1]["generation"] > dataset.generation
+    assert completed[1]["stage"] == "completed"
+    assert completed[1]["generation"] == built[1]["generation"]
@@ -0,0 +1,82 @@
+"""Tests for the load-time index structures."""
+from __future__ import annotations
+
+import bisect
+import math
+import random
+
+import pytest
+
+from astro_analysis_service import bitmaps
+from astro_analysis_service.neighbors import KDTree
+from astro_analysis_service.sketches import KLLSketch
+from astro_analysis_service.spectral import SpectralClass, parse_spectral_type
+
+
+def test_bitmap_round_trip_and_popcount():
+    """Positions survive a bitmap round trip and intersections count correctly."""
+    left = bitmaps.from_positions([0, 3, 8, 9, 70], size=80)
+    right = bitmaps.from_positions([3, 9, 10, 70, 79], size=80)
+    assert list(bitmaps.iter_positions(left)) == [0, 3, 8, 9, 70]
+    assert list(bitmaps.iter_positions(left & right)) == [3, 9, 70]
+    assert bitmaps.count(left & right) == 3
+    assert bitmaps.count(bitmaps.full(80)) == 80
+    assert not list(bitmaps.iter_positions(0))
+
+
+def test_kdtree_matches_brute_force():
+    """KD-tree k-NN and radius queries agree with an exhaustive scan."""
+    rng = random.Random(7)
+    points = [(rng.uniform(-3, 3), rng.uniform(-3, 3)) for _ in range(500)]
+    tree = KDTree(points)
+    allowed = bitmaps.membership(bitmaps.from_positions(range(0, 500, 3), 500), 500)
+
+    for _ in range(25):
+        query = (rng.uniform(-3, 3), rng.uniform(-3, 3))
+        exact = sorted(
+            (math.dist(query, point), pos) for pos, point in enumerate(points)
+        )
+        assert [pos for _, pos in tree.nearest(query, 7)] == [pos for _, pos in exact[:7]]
+        filtered = [pos for _, pos in exact if pos % 3 == 0][:5]
+        assert [pos for _, pos in tree.nearest(query, 5, allowed)] == filtered
+        inside = [pos for dist, pos in exact if dist <= 0.5]
+        assert [pos for _, pos in tree.within(query, 0.5)] == inside
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("K1.5III", SpectralClass("K", 1.5, "III")),
+        ("F5IV-V", SpectralClass("F", 5.0, "IV")),
+        ("F0 IV", SpectralClass("F", 0.0, "IV")),
+        ("M2Iab", SpectralClass("M", 2.0, "I")),
+        ("B6Vep", SpectralClass("B", 6.0, "V")),
+        ("G5", SpectralClass("G", 5.0, None)),
+        ("dM3", SpectralClass("M", 3.0, "V")),
+        ("K3V+M0V", SpectralClass("K", 3.0, "V")),
+        ("Unknown", None),
+        ("", None),
+    ],
+)
+def test_parse_spectral_type(text, expected):
+    """Free-text MK types parse into temperature class, subclass and luminosity class."""
+    assert parse_spectral_type(text) == expected
+
+
+def test_kll_sketch_quantiles_and_merge():
+    """KLL sketches stay within a small rank error and merge without the raw data."""
+    rng = random.Random(3)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    ordered = sorted(values)
+    whole = KLLSketch.from_values(values)
+    merged = KLLSketch.from_values(values[:7000])
+    merged.merge(KLLSketch.from_values(values[7000:]))
+
+    for sketch in (whole, merged):
+        assert len(sketch) == len(values)
+        assert sketch.quantile(0) == ordered[0]
+        assert sketch.quantile(1) == ordered[-1]
+        for q in (0.1, 0.5, 0.9):
+            estimate = sketch.quantile(q)
+            true_rank = bisect.bisect_right(ordered, estimate) / len(values)
+            assert abs(true_rank - q) < 0.02
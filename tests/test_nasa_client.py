@@ -5,6 +5,7 @@ from pathlib import Path
 
 import pytest
 
+from astro_analysis_service import data_loader
 from astro_analysis_service.data_loader import _api_record_to_object
 from astro_analysis_service.nasa_client import DISTANCE_PC_TO_LY, NASAExoplanetClient
 
@@ -30,21 +31,23 @@ def test_nasa_client_uses_cache(tmp_path: Path, sample_records):
     client = NASAExoplanetClient(cache_path=cache_path, ttl_seconds=60)
 
     # Force a refresh to populate cache
-    def fake_fetch():
+    def fake_fetch(*_args):
         return sample_records
 
     client._fetch_remote = fake_fetch  # type: ignore[attr-defined]
-    fetched = client.get_objects(force_refresh=True)
+    fetched, fetched_at = client.get_records(force_refresh=True)
     assert fetched == sample_records
     assert cache_path.exists()
 
     # Break remote fetch to ensure cache is used
-    def _raise():  # pragma: no cover - behavior validated via cache hit
+    def _raise(*_args):  # pragma: no cover - behavior validated via cache hit
         raise AssertionError("Should not hit network")
 
     client._fetch_remote = _raise  # type: ignore[attr-defined]
     cached = client.get_objects()
     assert cached == sample_records
+    # The fetch stamp travels with the cache, so other processes see the same epoch.
+    assert client.get_records(limit=1) == (sample_records[:1], fetched_at)
 
 
 def test_api_record_conversion(sample_records):
@@ -56,3 +59,74 @@ def test_api_record_conversion(sample_records):
     assert obj.spectral_type == "G5"
     assert obj.magnitude == pytest.approx(11.664)
     assert obj.distance_ly == pytest.approx(195.0 * DISTANCE_PC_TO_LY, rel=1e-5)
+
+
+def test_nasa_client_cache_serves_smaller_limits(tmp_path: Path, sample_records):
+    """A cache fetched for a larger limit answers smaller limits with a prefix."""
+    records = sample_records * 3
+    client = NASAExoplanetClient(cache_path=tmp_path / "cache.json", ttl_seconds=60)
+    fetched_limits = []
+
+    def fake_fetch(limit=None):
+        fetched_limits.append(limit)
+        return records[:limit]
+
+    client._fetch_remote = fake_fetch  # type: ignore[attr-defined]
+    client.get_objects(force_refresh=True, limit=3)
+    assert client.get_objects(limit=2) == records[:2]
+    assert client.get_objects(limit=5) == records
+    assert fetched_limits == [3, 5]
+
+
+def test_snapshot_registry_derives_prefixes_and_evicts(monkeypatch, sample_records):
+    """Smaller limits are sliced from a resident snapshot; the row budget evicts LRU."""
+    objects = [
+        _api_record_to_object(sample_records[0], idx=idx) for idx in range(1, 9)
+    ]
+    fetched_limits = []
+    fetched_at = "2026-10-01T00:00:00+00:00"
+
+    def fake_load(force_refresh=False, limit=None):  # pylint: disable=unused-argument
+        fetched_limits.append(limit)
+        return objects[:limit], fetched_at
+
+    monkeypatch.setattr(data_loader, "_load_from_nasa", fake_load)
+    registry = data_loader.SnapshotRegistry(default_limit=8, max_rows=12)
+
+    full = registry.get()
+    prefix = registry.get(5)
+    assert len(full) == 8 and len(prefix) == 5
+    assert prefix.generation != full.generation
+    assert fetched_limits == [8]
+    assert registry.limits() == [5]
+    assert registry.get(5) is prefix
+
+    # Rebuilding an evicted limit or re-slicing a prefix of the same fetch keeps generations.
+    assert registry.get().generation == full.generation
+    assert registry.get(5).generation == prefix.generation
+
+    # Another process rewrote the shared cache: the rebuilt snapshot is a new generation.
+    fetched_at = "2026-10-02T00:00:00+00:00"
+    registry.clear()
+    assert registry.get().generation not in (full.generation, prefix.generation)
+
+
+def test_rows_collapse_into_host_records():
+    """Planet rows fold into one host with a distinct-planet count and child rows."""
+    base = {"sy_snum": "1", "sy_vmag": "5.98", "sy_dist": "41.2"}
+    records = [
+        {**base, "pl_name": "HR 8799 e", "hostname": "HR 8799", "st_spectype": None},
+        {**base, "pl_name": "HR 8799 c", "hostname": "HR 8799", "st_spectype": "A5 V"},
+        {**base, "pl_name": "HD 1 b", "hostname": "HD 1", "sy_vmag": "6.1"},
+        {**base, "pl_name": "HR 8799 e", "hostname": "HR 8799", "st_spectype": "A5"},
+    ]
+    hosts = data_loader._group_by_host(records)
+    assert [(host.id, host.name, host.planet_count) for host in hosts] == [
+        (1, "HR 8799", 2), (3, "HD 1", 1),
+    ]
+    assert hosts[0].spectral_type == "A5 V"
+    assert [row.record_id for row in hosts[0].rows] == [1, 2, 4]
+
+    prefix = data_loader._host_prefix(hosts[0], limit=1)
+    assert (prefix.planet_count, prefix.spectral_type, len(prefix.rows)) == (1, "Unknown", 1)
+    assert data_loader._host_prefix(hosts[1], limit=3) is hosts[1]
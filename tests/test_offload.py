@@ -0,0 +1,47 @@
+"""Tests for offloading analytics to forked worker processes."""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+
+import pytest
+
+from astro_analysis_service.data_loader import SNAPSHOTS, load_dataset
+from astro_analysis_service.models import BatchQuerySpec
+from astro_analysis_service import offload
+from astro_analysis_service.offload import AnalyticsPool
+from astro_analysis_service.service import evaluate_batch, get_magnitude_distribution
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork",
+)
+def test_forked_workers_match_in_process_results():
+    """Workers compute against inherited snapshots and refork for new generations."""
+    pool = AnalyticsPool(1, SNAPSHOTS.resident)
+    try:
+        dataset = load_dataset()
+        remote = asyncio.run(pool.run(dataset, get_magnitude_distribution, 5))
+        assert remote == get_magnitude_distribution(5, dataset=dataset)
+
+        refreshed = load_dataset(force_refresh=True)
+        queries = [BatchQuerySpec(kind="stats", magnitude_max=0.1)]
+        results = asyncio.run(pool.run(refreshed, evaluate_batch, queries))
+        assert results == evaluate_batch(queries, refreshed)
+        # Only the workers keep the snapshots they inherited; the parent holds none.
+        assert not offload._SHARED_DATASETS  # pylint: disable=protected-access
+
+        # Tasks on generations the workers already share reuse them without re-forking.
+        executor = pool._executor  # pylint: disable=protected-access
+        asyncio.run(pool.run(refreshed, get_magnitude_distribution, 5))
+        assert pool._executor is executor  # pylint: disable=protected-access
+    finally:
+        pool.close()
+
+
+def test_pool_without_workers_runs_in_threadpool():
+    """With no workers the call runs in-process against the given snapshot."""
+    pool = AnalyticsPool(0, SNAPSHOTS.resident)
+    dataset = load_dataset()
+    result = asyncio.run(pool.run(dataset, get_magnitude_distribution, 5))
+    assert result == get_magnitude_distribution(5, dataset=dataset)
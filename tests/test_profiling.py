@@ -0,0 +1,86 @@
+"""Tests for the opt-in profiling and memory introspection endpoints."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from astro_analysis_service.main import ANALYTICS_POOL, PROFILE_ROUTER, TRACEMALLOC, app
+from astro_analysis_service.profiling import SamplingProfiler, deep_sizeof
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def profiling_client():
+    """A client for an app with the profiling router mounted, as ENABLE_PROFILING does."""
+    profiling_app = FastAPI()
+    profiling_app.include_router(PROFILE_ROUTER)
+    yield TestClient(profiling_app)
+    TRACEMALLOC.stop()
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_busy_thread_stacks():
+    """Busy threads show up as root-to-leaf collapsed stacks with sample counts."""
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        stacks = SamplingProfiler().sample(0.1, 0.005)
+    finally:
+        stop.set()
+        worker.join()
+    spinner = [stack for stack in stacks if stack.startswith("spinner;")]
+    assert spinner and all("_spin (test_profiling.py" in stack for stack in spinner)
+    line = SamplingProfiler.format_collapsed(stacks).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    """Reachable objects are counted once, across calls that share ``seen``."""
+    shared = ["x" * 1000]
+    seen: set = set()
+    first = deep_sizeof({"a": shared}, seen=seen)
+    assert first > 1000
+    assert deep_sizeof({"b": shared}, seen=seen) < 1000
+
+
+def test_profiling_endpoints_are_hidden_by_default():
+    """Without ENABLE_PROFILING the endpoints are neither routed nor documented."""
+    assert client.get("/admin/profile/memory").status_code == 404
+    assert client.post("/admin/profile/cpu", params={"seconds": 0.01}).status_code == 404
+    paths = client.get("/openapi.json").json()["paths"]
+    assert not any(path.startswith("/admin/profile") for path in paths)
+
+
+def test_profiling_endpoints_report_cpu_and_memory(profiling_client, monkeypatch):
+    """Enabled endpoints return collapsed stacks, allocation sites and footprints."""
+    cpu = profiling_client.post("/admin/profile/cpu", params={"seconds": 0.05, "idle": True})
+    assert cpu.status_code == 200
+    assert cpu.headers["content-type"].startswith("text/plain")
+
+    assert profiling_client.get("/admin/profile/tracemalloc").status_code == 409
+    assert profiling_client.post("/admin/profile/tracemalloc/start").json() == {"tracing": True}
+    client.get("/stats")
+    snapshot = profiling_client.get("/admin/profile/tracemalloc", params={"top": 5}).json()
+    assert snapshot["top"] and not snapshot["compared"]
+    diff = profiling_client.get("/admin/profile/tracemalloc", params={"compare": True}).json()
+    assert diff["compared"] and "size_diff" in diff["top"][0]
+
+    memory = profiling_client.get("/admin/profile/memory").json()
+    (snapshot_info,) = memory["snapshots"]
+    assert snapshot_info["rows"] == 10
+    assert snapshot_info["bytes"]["columns"] > 0
+    assert memory["total_bytes"] >= snapshot_info["total_bytes"]
+    assert "filter_sketches" in memory["caches"]
+
+    # Forked workers hold the filtered-sketch cache, so the parent does not report it.
+    monkeypatch.setattr(ANALYTICS_POOL, "workers", 1)
+    assert "filter_sketches" not in profiling_client.get("/admin/profile/memory").json()["caches"]